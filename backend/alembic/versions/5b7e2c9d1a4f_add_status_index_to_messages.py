@@ -0,0 +1,28 @@
+"""add_status_index_to_messages
+
+Revision ID: 5b7e2c9d1a4f
+Revises: 8e36fbb3d452
+Create Date: 2026-10-16 18:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2c9d1a4f'
+down_revision: Union[str, None] = '8e36fbb3d452'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Index messages.status for the moderation (blocked/flagged) queries
+    op.create_index(op.f('ix_messages_status'), 'messages', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    # Remove the status index from messages table
+    op.drop_index(op.f('ix_messages_status'), table_name='messages')
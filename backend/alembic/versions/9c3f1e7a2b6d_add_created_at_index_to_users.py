@@ -0,0 +1,28 @@
+"""add_created_at_index_to_users
+
+Revision ID: 9c3f1e7a2b6d
+Revises: 5b7e2c9d1a4f
+Create Date: 2026-10-16 18:35:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3f1e7a2b6d'
+down_revision: Union[str, None] = '5b7e2c9d1a4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Index users.created_at for newest-first listings and date-range counts
+    op.create_index(op.f('ix_users_created_at'), 'users', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    # Remove the created_at index from users table
+    op.drop_index(op.f('ix_users_created_at'), table_name='users')
@@ -18,7 +18,7 @@ from app.models.conversation import Conversation
 from app.models.message import Message
 from app.services.moderation import moderation_service
 from app.services.llm_provider import LLMProvider
-from app.services.rag.pipeline import RAGPipeline
+from app.services.rag.pipeline import get_pipeline
 from app.core.logging_config import log_admin_action, get_admin_logger
 
 router = APIRouter()
@@ -147,7 +147,7 @@ async def get_admin_stats(
         
         # System health checks
         llm_provider = LLMProvider()
-        rag_pipeline = RAGPipeline()
+        rag_pipeline = get_pipeline()
         
         llm_health = await llm_provider.health_check()
         rag_health = await rag_pipeline.health_check()
@@ -941,7 +941,7 @@ async def get_system_health(
     try:
         # Get health status from all components
         llm_provider = LLMProvider()
-        rag_pipeline = RAGPipeline()
+        rag_pipeline = get_pipeline()
         
         llm_health = await llm_provider.health_check()
         rag_health = await rag_pipeline.health_check()
@@ -4,6 +4,7 @@ Authentication endpoints for user registration, login, and token management.
 from datetime import timedelta, datetime, timezone
 from typing import Dict, Any
 from uuid import UUID, uuid4
+import asyncio
 import requests
 import os
 import logging
@@ -782,7 +783,10 @@ async def sync_password_with_postgres(
     """
     try:
         # Step 1: Verify the Firebase ID token (security check)
-        decoded_token = firebase_auth.verify_id_token(request.firebase_id_token)
+        # Blocking call (may fetch Google's signing certs); keep it off the event loop
+        decoded_token = await asyncio.to_thread(
+            firebase_auth.verify_id_token, request.firebase_id_token
+        )
         email = decoded_token.get('email')
         
         if not email:
@@ -1053,8 +1057,8 @@ async def verify_and_login(
                 detail="Firebase ID token is required"
             )
         
-        # Verify the Firebase token
-        decoded_token = firebase_auth.verify_id_token(firebase_id_token)
+        # Verify the Firebase token off the event loop (may fetch signing certs)
+        decoded_token = await asyncio.to_thread(firebase_auth.verify_id_token, firebase_id_token)
         email = decoded_token.get('email')
         
         if not email:
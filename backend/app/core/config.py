@@ -23,6 +23,16 @@ POSTGRES_DB = os.getenv("POSTGRES_DB", "veda")
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
+# Connection pool: connections kept open, extra ones allowed under load, and the
+# age in seconds after which a connection is replaced
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Statement caches: compiled SQL kept by SQLAlchemy, and prepared statements
+# kept per connection by asyncpg
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "1024"))
+
 # -------------------------------
 # Authentication & Security
 # -------------------------------
@@ -30,6 +40,7 @@ JWT_SECRET = os.getenv("JWT_SECRET", "secret_key")
 JWT_ALGORITHM = os.getenv("JWT_ALG", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # bcrypt work factor (4-31)
 
 # -------------------------------
 # Google OAuth Configuration
@@ -68,6 +79,16 @@ DOCUMENTS_PATH = os.getenv("DOCUMENTS_PATH", "./data/documents")
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "llama-text-embed-v2")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))  # chunks per embed + upsert call
+UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "4"))  # batches in flight at once
+# In-process semantic cache: reuse results for queries at least this cosine-similar
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "256"))  # 0 disables
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+# On-disk query embedding cache (SQLite); set to an empty string to disable
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "veda", "embeddings.sqlite")
+)
 
 # -------------------------------
 # Model Configuration
@@ -5,11 +5,19 @@ Provides password hashing, JWT token creation/verification.
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from passlib.context import CryptContext
-from jose import JWTError, jwt
+import jwt
 from . import config
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Signing key and algorithm list resolved once instead of on every call
+_JWT_KEY = config.JWT_SECRET.encode("utf-8")
+_JWT_ALGORITHMS = [config.JWT_ALGORITHM]
+
+# Password hashing context using bcrypt; cost comes from BCRYPT_ROUNDS
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=config.BCRYPT_ROUNDS,
+)
 
 
 def hash_password(password: str) -> str:
@@ -71,7 +79,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         expire = datetime.now(timezone.utc) + timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, config.JWT_SECRET, algorithm=config.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=config.JWT_ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -93,7 +101,7 @@ def create_refresh_token(data: Dict[str, Any], expires_delta: Optional[timedelta
         expire = datetime.now(timezone.utc) + timedelta(days=config.REFRESH_TOKEN_EXPIRE_DAYS)
 
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, config.JWT_SECRET, algorithm=config.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=config.JWT_ALGORITHM)
     return encoded_jwt
 
 
@@ -108,9 +116,9 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
         Decoded token payload or None if invalid
     """
     try:
-        payload = jwt.decode(token, config.JWT_SECRET, algorithms=[config.JWT_ALGORITHM])
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
         return payload
-    except JWTError:
+    except jwt.PyJWTError:
         return None
 
 
@@ -2,17 +2,57 @@
 Database session management.
 Provides async SQLAlchemy engine and session factory.
 """
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from ..core import config
 
+# orjson speeds up (de)serialization of JSON columns such as message_metadata (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _database_url():
+    """DATABASE_URL, with asyncpg's prepared statement cache sized unless already set."""
+    url = make_url(config.DATABASE_URL)
+    if url.get_driver_name() == "asyncpg" and "prepared_statement_cache_size" not in url.query:
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(config.DB_STATEMENT_CACHE_SIZE)}
+        )
+    return url
+
+
+def _json_serializer(value):
+    """Serialize a JSON column value with orjson, as text like json.dumps."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+# Only override SQLAlchemy's stdlib json (de)serializers when orjson is installed
+_json_options = (
+    {"json_serializer": _json_serializer, "json_deserializer": orjson.loads}
+    if ORJSON_AVAILABLE
+    else {}
+)
+
+
 # Create async engine
 # echo=True for development (logs SQL), set to False in production
 engine = create_async_engine(
-    config.DATABASE_URL,
+    _database_url(),
     echo=config.DEBUG,
     future=True,
+    query_cache_size=config.DB_QUERY_CACHE_SIZE,  # Reuse compiled SQL for repeated queries
+    poolclass=AsyncAdaptedQueuePool,  # Reuse open connections across sessions
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_recycle=config.DB_POOL_RECYCLE,  # Replace connections before the server drops them
     pool_pre_ping=True,  # Verify connections before using them
+    **_json_options,
 )
 
 # Create async session factory
@@ -22,7 +22,7 @@ class Message(Base):
     )
     sender = Column(String(50), nullable=False)  # "user" or "assistant"
     content = Column(TEXT, nullable=False)
-    status = Column(String(50), default="sent")  # "sent", "delivered", "error", "incomplete"
+    status = Column(String(50), default="sent", index=True)  # "sent", "delivered", "error", "incomplete"
     message_metadata = Column(JSON, nullable=True)  # Store additional data like file URLs, etc.
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
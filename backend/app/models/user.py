@@ -21,7 +21,7 @@ class User(Base):
     role = Column(String(50), default="user")
     auth_provider = Column(String(50), default="email")  # 'email' or 'google'
     refresh_tokens = Column(JSON, server_default='[]')  # Store refresh tokens metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     # Relationships
     conversations = relationship(
@@ -15,6 +15,10 @@ from ..core import config
 
 logger = logging.getLogger(__name__)
 
+# Filename sanitization patterns, compiled once at import
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\s\-\.]')
+_WHITESPACE_RUN = re.compile(r'\s+')
+
 
 class FileType(Enum):
     """Supported file types for uploads."""
@@ -87,8 +91,8 @@ class FileHandler:
         
         # Remove or replace dangerous characters
         # Keep only alphanumeric, dots, hyphens, underscores
-        filename = re.sub(r'[^\w\s\-\.]', '', filename)
-        filename = re.sub(r'\s+', '_', filename)
+        filename = _UNSAFE_FILENAME_CHARS.sub('', filename)
+        filename = _WHITESPACE_RUN.sub('_', filename)
         
         # Limit length
         name_part, ext_part = os.path.splitext(filename)
@@ -196,6 +200,11 @@ class FileHandler:
         # Validate file type
         self.validate_file_type(file, file_type)
         
+        # Reject oversized uploads from the parsed size before reading
+        # the whole body into memory
+        if file.size is not None:
+            self.validate_file_size(file.size, file_type)
+        
         # Read file content
         content = await file.read()
         file_size = len(content)
@@ -17,7 +17,7 @@ from app.core.config import (
     STT_MODEL, SUMMARIZER_MODEL, MAIN_MODEL, TRANSLATION_MODEL,
     SKIP_SUMMARIZER, SKIP_RAG, USE_DEV_LLM
 )
-from .rag.pipeline import RAGPipeline
+from .rag.pipeline import get_pipeline
 from .audio_utils import transcribe_audio, translate_text
 from .moderation import moderation_service, ModerationResult
 from ..core.logging_config import log_moderation_event, get_component_logger
@@ -121,7 +121,7 @@ class LLMProvider:
         
         # Initialize RAG pipeline
         try:
-            self.rag = RAGPipeline()
+            self.rag = get_pipeline()
             logger.info("RAG pipeline initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize RAG pipeline: {e}")
@@ -6,19 +6,42 @@ Implements keyword-based screening for safety and compliance.
 import json
 import re
 import os
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 from pathlib import Path
 from datetime import datetime
 import logging
+from functools import lru_cache
+
+# Aho-Corasick automaton for single-pass keyword scanning (optional)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
 
 from app.core.config import ENABLE_MODERATION
 
 logger = logging.getLogger(__name__)
 
 
+# Number of distinct normalized messages whose scan outcome is memoized
+SCAN_CACHE_SIZE = 4096
+
+
+def _is_word_char(char: str) -> bool:
+    """Match the regex \\w definition used for word boundaries."""
+    return char.isalnum() or char == "_"
+
+
 class ModerationResult:
     """Result of content moderation analysis."""
     
+    __slots__ = (
+        "is_safe", "severity", "matched_keywords", "action",
+        "message", "metadata", "timestamp",
+    )
+    
     def __init__(
         self,
         is_safe: bool = True,
@@ -50,12 +73,22 @@ class ModerationService:
             "core", 
             "moderation_rules.json"
         )
+        self._rules_signature = self._rules_file_signature()
         self.rules = self._load_rules()
         self.enabled = ENABLE_MODERATION
         
         # Compile regex patterns for better performance
         self._compiled_patterns = self._compile_patterns()
         
+        # Single automaton over every keyword, used to pick candidate keywords
+        self._automaton = self._build_automaton()
+        
+        # Union of all keywords; screens out clean content when there is no automaton
+        self._keyword_pattern = self._compile_keyword_pattern()
+        
+        # Memoized scan outcomes; only valid for the currently loaded rules
+        self._cached_scan = lru_cache(maxsize=SCAN_CACHE_SIZE)(self._scan)
+        
         # Statistics tracking
         self.stats = {
             "total_checks": 0,
@@ -76,6 +109,12 @@ class ModerationService:
             with open(self.rules_file, 'r', encoding='utf-8') as f:
                 rules = json.load(f)
             
+            # Case-fold keywords once here so matching never folds them again
+            rules = {
+                severity: [keyword.casefold() for keyword in keywords]
+                for severity, keywords in rules.items()
+            }
+            
             logger.info(f"Loaded moderation rules from {self.rules_file}")
             logger.info(f"Rule categories: {list(rules.keys())}")
             
@@ -90,7 +129,17 @@ class ModerationService:
             logger.error(f"Error loading moderation rules: {e}")
             return {"high": [], "medium": [], "low": [], "medical_emergency": []}
     
-    def _compile_patterns(self) -> Dict[str, List[re.Pattern]]:
+    def _rules_file_signature(self) -> Optional[Tuple[int, int]]:
+        """Return (mtime_ns, size) of the rules file, or None if it can't be read."""
+        
+        try:
+            stat = os.stat(self.rules_file)
+        except OSError:
+            return None
+        
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _compile_patterns(self) -> Dict[str, List[Tuple[str, re.Pattern]]]:
         """Compile regex patterns for efficient matching."""
         
         compiled = {}
@@ -100,10 +149,11 @@ class ModerationService:
             for keyword in keywords:
                 # Create word boundary pattern for better matching
                 # This prevents partial matches (e.g., "assault" in "massage")
-                pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
+                # Keywords and content are both case-folded, so no IGNORECASE
+                pattern = r'\b' + re.escape(keyword) + r'\b'
                 try:
-                    compiled_pattern = re.compile(pattern, re.IGNORECASE)
-                    patterns.append(compiled_pattern)
+                    compiled_pattern = re.compile(pattern)
+                    patterns.append((keyword, compiled_pattern))
                 except re.error as e:
                     logger.warning(f"Invalid regex pattern for '{keyword}': {e}")
             
@@ -111,6 +161,82 @@ class ModerationService:
         
         return compiled
     
+    def _compile_keyword_pattern(self) -> Optional[re.Pattern]:
+        """Compile one word-bounded alternation over every keyword."""
+        
+        keywords = {keyword for keywords in self.rules.values() for keyword in keywords}
+        if not keywords:
+            return None
+        
+        # Longest first, so a phrase is tried before any keyword it starts with
+        alternation = "|".join(
+            re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)
+        )
+        try:
+            return re.compile(r'\b(?:' + alternation + r')\b')
+        except re.error as e:
+            logger.warning(f"Invalid combined keyword pattern: {e}")
+            return None
+    
+    def _build_automaton(self):
+        """Build an Aho-Corasick automaton over all keywords, if available."""
+        
+        if not AHOCORASICK_AVAILABLE:
+            logger.info("pyahocorasick not installed, scanning keywords one by one")
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for keywords in self.rules.values():
+            for keyword in keywords:
+                automaton.add_word(keyword, keyword)
+        
+        if len(automaton) == 0:
+            return None
+        
+        automaton.make_automaton()
+        return automaton
+    
+    def _find_keyword_hits(self, content: str) -> Optional[Dict[str, int]]:
+        """
+        Count whole-word keyword occurrences in content in one pass.
+        
+        The automaton reports every substring hit; a hit is kept only if it
+        sits on word boundaries, checked on the two neighbouring characters
+        (the same rule as the regex \\b). Without an automaton, one search
+        with the combined keyword pattern rules out clean content (empty
+        result); otherwise None is returned so callers fall back to the
+        per-keyword patterns, which count overlapping matches.
+        """
+        
+        if self._automaton is None:
+            if self._keyword_pattern is not None and not self._keyword_pattern.search(content):
+                return {}
+            return None
+        
+        hits: Dict[str, int] = {}
+        for _, keyword in self._iter_word_hits(content):
+            hits[keyword] = hits.get(keyword, 0) + 1
+        
+        return hits
+    
+    def _iter_word_hits(self, content: str) -> Iterator[Tuple[int, str]]:
+        """Yield (end index, keyword) for every whole-word automaton hit."""
+        
+        last = len(content) - 1
+        
+        for end, keyword in self._automaton.iter(content):
+            start = end - len(keyword) + 1
+            
+            at_start = _is_word_char(keyword[0]) != (
+                start > 0 and _is_word_char(content[start - 1])
+            )
+            at_end = _is_word_char(keyword[-1]) != (
+                end < last and _is_word_char(content[end + 1])
+            )
+            
+            if at_start and at_end:
+                yield end, keyword
+    
     def moderate_content(self, content: str, context: Optional[Dict] = None) -> ModerationResult:
         """
         Moderate content for safety and compliance.
@@ -131,28 +257,99 @@ class ModerationService:
         
         self.stats["total_checks"] += 1
         
-        # Normalize content for analysis
-        normalized_content = content.lower().strip()
+        # Normalize content for analysis (case-folded exactly once)
+        normalized_content = content.casefold().strip()
         
-        # Check each severity level
-        for severity in ["high", "medium", "low", "medical_emergency"]:
-            matched_keywords = self._check_severity_level(normalized_content, severity)
+        # Repeated messages are answered from the scan cache
+        match = self._cached_scan(normalized_content)
+        
+        return self._result_for_match(match, content, context)
+    
+    def moderate_batch(
+        self,
+        contents: List[str],
+        context: Optional[Dict] = None
+    ) -> List[ModerationResult]:
+        """
+        Moderate many texts at once, e.g. an offline audit of stored messages.
+        
+        With the automaton, all texts are joined into one corpus and scanned
+        in a single pass; hit offsets are mapped back to their rows with a
+        binary search over the cumulative row lengths. Results, logging and
+        statistics are the same as calling moderate_content per text.
+        
+        Args:
+            contents: Text contents to moderate
+            context: Additional context shared by every text
             
-            if matched_keywords:
-                result = self._create_result_for_severity(
-                    severity, 
-                    matched_keywords, 
-                    content, 
-                    context
+        Returns:
+            ModerationResult for each text, in input order
+        """
+        
+        if not self.enabled or self._automaton is None:
+            return [self.moderate_content(content, context) for content in contents]
+        
+        # Only this offline sweep needs numpy, so it stays out of the module import
+        import numpy as np
+        
+        normalized = [content.casefold().strip() if content else "" for content in contents]
+        
+        # "\n" is not a word character, so row edges act as word boundaries
+        corpus = "\n".join(normalized)
+        lengths = np.fromiter(map(len, normalized), dtype=np.int64, count=len(normalized))
+        row_starts = np.cumsum(lengths + 1) - (lengths + 1)
+        
+        hit_ends: List[int] = []
+        hit_keywords: List[str] = []
+        for end, keyword in self._iter_word_hits(corpus):
+            hit_ends.append(end)
+            hit_keywords.append(keyword)
+        
+        rows = np.searchsorted(row_starts, np.asarray(hit_ends, dtype=np.int64), side="right") - 1
+        
+        row_hits: List[Dict[str, int]] = [{} for _ in normalized]
+        for row, keyword in zip(rows.tolist(), hit_keywords):
+            hits = row_hits[row]
+            hits[keyword] = hits.get(keyword, 0) + 1
+        
+        results = []
+        for content, normalized_content, hits in zip(contents, normalized, row_hits):
+            if not normalized_content:
+                results.append(
+                    ModerationResult(is_safe=True, action="allow", message="Empty content")
                 )
-                
-                # Log the moderation event
-                self._log_moderation_event(result, content, context)
-                
-                # Update statistics
-                self._update_stats(severity, result.action)
-                
-                return result
+                continue
+            
+            self.stats["total_checks"] += 1
+            match = self._match_severity(normalized_content, hits)
+            results.append(self._result_for_match(match, content, context))
+        
+        return results
+    
+    def _result_for_match(
+        self,
+        match: Optional[Tuple[str, Tuple[str, ...]]],
+        content: str,
+        context: Optional[Dict]
+    ) -> ModerationResult:
+        """Build, log and count the result for a scan outcome."""
+        
+        if match is not None:
+            severity, matched_keywords = match
+            result = self._create_result_for_severity(
+                severity, 
+                list(matched_keywords), 
+                content, 
+                context
+            )
+            
+            # Log the moderation event
+            self._log_moderation_event(result, content, context)
+            
+            # Update statistics
+            self._update_stats(severity, result.action)
+            
+            return result
         
         # No matches found - content is safe
         return ModerationResult(
@@ -161,17 +358,66 @@ class ModerationService:
             message="Content passed moderation checks"
         )
     
-    def _check_severity_level(self, content: str, severity: str) -> List[str]:
+    def _scan(self, normalized_content: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        """
+        Find the first severity level with matching keywords.
+        
+        Depends only on the normalized content and the loaded rules, so the
+        outcome is memoized per instance and cleared on reload_rules.
+        
+        Returns:
+            (severity, matched keywords) or None if nothing matched
+        """
+        
+        # Whole-word keyword hits from a single automaton pass
+        hits = self._find_keyword_hits(normalized_content)
+        
+        return self._match_severity(normalized_content, hits)
+    
+    def _match_severity(
+        self,
+        normalized_content: str,
+        hits: Optional[Dict[str, int]]
+    ) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        """Pick the first severity level with matching keywords, given the hits."""
+        
+        # Check each severity level
+        for severity in ["high", "medium", "low", "medical_emergency"]:
+            if hits is not None and not hits:
+                break
+            
+            matched_keywords = self._check_severity_level(
+                normalized_content, severity, hits
+            )
+            
+            if matched_keywords:
+                return severity, tuple(matched_keywords)
+        
+        return None
+    
+    def _check_severity_level(
+        self,
+        content: str,
+        severity: str,
+        hits: Optional[Dict[str, int]] = None
+    ) -> List[str]:
         """Check content against patterns for a specific severity level."""
         
         matched_keywords = []
         patterns = self._compiled_patterns.get(severity, [])
         
-        for pattern in patterns:
+        for keyword, pattern in patterns:
+            # Automaton hits are already boundary-checked; no regex needed
+            if hits is not None:
+                matched_keywords.extend([keyword] * hits.get(keyword, 0))
+                continue
+            
+            # Plain substring test first; only run the regex on a possible hit
+            if keyword not in content:
+                continue
+            
             matches = pattern.findall(content)
             if matches:
-                # Get the original keyword from the pattern
-                keyword = pattern.pattern.replace(r'\b', '').replace('\\', '')
                 matched_keywords.extend(matches)
         
         return matched_keywords
@@ -264,15 +510,16 @@ class ModerationService:
             "metadata": result.metadata
         }
         
-        # Use different log levels based on severity
+        # Use different log levels based on severity; the entry is only
+        # formatted if a handler emits the record
         if result.severity == "high":
-            logger.error(f"HIGH SEVERITY CONTENT BLOCKED: {log_entry}")
+            logger.error("HIGH SEVERITY CONTENT BLOCKED: %s", log_entry)
         elif result.severity == "medical_emergency":
-            logger.warning(f"MEDICAL EMERGENCY DETECTED: {log_entry}")
+            logger.warning("MEDICAL EMERGENCY DETECTED: %s", log_entry)
         elif result.severity == "medium":
-            logger.warning(f"MEDIUM SEVERITY CONTENT FLAGGED: {log_entry}")
+            logger.warning("MEDIUM SEVERITY CONTENT FLAGGED: %s", log_entry)
         elif result.severity == "low":
-            logger.info(f"LOW SEVERITY CONTENT WARNING: {log_entry}")
+            logger.info("LOW SEVERITY CONTENT WARNING: %s", log_entry)
     
     def _update_stats(self, severity: str, action: str):
         """Update moderation statistics."""
@@ -376,9 +623,19 @@ class ModerationService:
         """Reload moderation rules from file."""
         
         try:
+            # Skip the re-parse and automaton rebuild if the file is untouched
+            signature = self._rules_file_signature()
+            if signature is not None and signature == self._rules_signature:
+                logger.info("Moderation rules file unchanged, keeping loaded rules")
+                return True
+            
             old_rules_count = sum(len(keywords) for keywords in self.rules.values())
+            self._rules_signature = signature
             self.rules = self._load_rules()
             self._compiled_patterns = self._compile_patterns()
+            self._automaton = self._build_automaton()
+            self._keyword_pattern = self._compile_keyword_pattern()
+            self._cached_scan.cache_clear()
             new_rules_count = sum(len(keywords) for keywords in self.rules.values())
             
             logger.info(f"Moderation rules reloaded: {old_rules_count} -> {new_rules_count} keywords")
@@ -416,6 +673,11 @@ def moderate_content(content: str, context: Optional[Dict] = None) -> Moderation
     return moderation_service.moderate_content(content, context)
 
 
+def load_rules() -> Dict[str, List[str]]:
+    """Load the case-folded moderation rules from the rules file."""
+    return moderation_service._load_rules()
+
+
 def is_content_safe(content: str) -> bool:
     """Quick check if content is safe."""
     result = moderation_service.moderate_content(content)
@@ -5,11 +5,16 @@ Handles document ingestion, embedding, and retrieval for healthcare knowledge.
 
 import os
 import asyncio
+import hashlib
+import sqlite3
+import threading
 from typing import List, Dict, Optional, Any
 from pathlib import Path
 import logging
 import time
 
+import numpy as np
+
 # LangChain imports
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
@@ -46,6 +51,11 @@ from app.core.config import (
     CHUNK_SIZE,
     CHUNK_OVERLAP,
     EMBEDDING_MODEL,
+    EMBED_BATCH_SIZE,
+    UPSERT_CONCURRENCY,
+    EMBEDDING_CACHE_PATH,
+    SEMANTIC_CACHE_SIZE,
+    SEMANTIC_CACHE_THRESHOLD,
     USE_DEV_LLM
 )
 
@@ -69,6 +79,127 @@ class MockEmbeddings:
         return [0.1] * 384
 
 
+class CachedQueryEmbeddings:
+    """
+    Embeddings wrapper that persists query embeddings in a SQLite file.
+    
+    Queries are keyed by SHA-256 of the model name and text, so repeated
+    retrievals (e.g. across seed script runs) skip the embedding model.
+    Vectors are stored as float16, half the size of float32, which is well
+    within the precision a similarity search needs. A miss returns the same
+    rounded vector a later hit will, so a query retrieves the same results
+    on every run. Document embeddings pass straight through.
+    """
+    
+    # Bumped whenever the stored vector encoding changes
+    SCHEMA_VERSION = 1
+    
+    def __init__(self, embeddings, model_name: str, cache_path: str):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        # Retrieval runs in worker threads; the lock serializes connection use
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        # Entries written with an older encoding can't be decoded; start afresh
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS query_embeddings")
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents without caching."""
+        return self.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Return the cached query embedding, embedding and storing it on a miss."""
+        key = self._key(text)
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vec FROM query_embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is not None:
+            return np.frombuffer(row[0], dtype=np.float16).astype(np.float32).tolist()
+        
+        packed = np.asarray(self.embeddings.embed_query(text), dtype=np.float16)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_embeddings (key, vec) VALUES (?, ?)",
+                (key, packed.tobytes())
+            )
+            self._conn.commit()
+        return packed.astype(np.float32).tolist()
+
+
+class SemanticQueryCache:
+    """
+    Small in-process LRU cache of retrieval results keyed by query embedding.
+    
+    A lookup takes one matrix-vector product against the cached unit vectors;
+    the closest entry is reused when its cosine similarity reaches the
+    threshold and it was retrieved with the same top_k, so paraphrased
+    queries skip the vector store round trip.
+    """
+    
+    def __init__(self, capacity: int, threshold: float):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._vectors: Optional[np.ndarray] = None  # (capacity, dim) unit rows
+        self._entries: List[Optional[tuple]] = [None] * capacity  # (top_k, results)
+        self._last_used = np.zeros(capacity, dtype=np.int64)  # 0 marks an empty slot
+        self._tick = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _unit(vector: List[float]) -> Optional[np.ndarray]:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else None
+    
+    def get(self, vector: List[float], top_k: int) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for a near-identical query, or None."""
+        query = self._unit(vector)
+        
+        with self._lock:
+            if query is None or self._vectors is None or query.shape[0] != self._vectors.shape[1]:
+                return None
+            
+            similarities = np.where(self._last_used > 0, self._vectors @ query, -1.0)
+            slot = int(np.argmax(similarities))
+            entry = self._entries[slot]
+            if similarities[slot] < self.threshold or entry[0] != top_k:
+                return None
+            
+            self._tick += 1
+            self._last_used[slot] = self._tick
+            return [dict(result) for result in entry[1]]
+    
+    def put(self, vector: List[float], top_k: int, results: List[Dict[str, Any]]) -> None:
+        """Store results, evicting the least recently used entry when full."""
+        query = self._unit(vector)
+        if query is None:
+            return
+        
+        with self._lock:
+            if self._vectors is None or query.shape[0] != self._vectors.shape[1]:
+                self._vectors = np.zeros((self.capacity, query.shape[0]), dtype=np.float32)
+                self._last_used[:] = 0
+            
+            slot = int(np.argmin(self._last_used))
+            self._tick += 1
+            self._vectors[slot] = query
+            self._entries[slot] = (top_k, [dict(result) for result in results])
+            self._last_used[slot] = self._tick
+
+
 class MockVectorStore:
     """Mock vector store for development mode."""
     
@@ -121,6 +252,7 @@ class RAGPipeline:
     
     def _init_dev_mode(self):
         """Initialize RAG pipeline in development mode."""
+        self.query_cache = None
         self.embeddings = MockEmbeddings()
         self.vectorstore = MockVectorStore()
         self.index = None
@@ -153,8 +285,22 @@ class RAGPipeline:
             
             # Initialize embeddings (using Pinecone's built-in model)
             from langchain_community.embeddings import HuggingFaceEmbeddings
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
+            model_name = "sentence-transformers/all-MiniLM-L6-v2"
+            self.embeddings = HuggingFaceEmbeddings(model_name=model_name)
+            if EMBEDDING_CACHE_PATH:
+                # The cache is optional; if it can't be opened, embed without it
+                try:
+                    self.embeddings = CachedQueryEmbeddings(
+                        self.embeddings, model_name, EMBEDDING_CACHE_PATH
+                    )
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(
+                        f"Query embedding cache unavailable at {EMBEDDING_CACHE_PATH}: {e}"
+                    )
+            
+            self.query_cache = (
+                SemanticQueryCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD)
+                if SEMANTIC_CACHE_SIZE > 0 else None
             )
             
             # Initialize vector store
@@ -199,12 +345,13 @@ class RAGPipeline:
         self.vectorstore.add_documents(sample_docs)
         logger.info(f"Loaded {len(sample_docs)} sample documents for development mode")
     
-    async def ingest_documents(self, path: str = None) -> int:
+    async def ingest_documents(self, path: str = None, batch_size: Optional[int] = None) -> int:
         """
         Load, split, embed and upsert documents into the vector store.
         
         Args:
             path: Path to documents directory (defaults to DOCUMENTS_PATH)
+            batch_size: Chunks embedded and upserted per call (defaults to EMBED_BATCH_SIZE)
             
         Returns:
             Number of document chunks processed
@@ -228,11 +375,11 @@ class RAGPipeline:
                 logger.warning(f"No documents found in {path}")
                 return 0
             
-            # Split documents into chunks
-            chunks = await self._split_documents(documents)
+            # Split documents into chunks, dropping repeated boilerplate
+            chunks = self._deduplicate_chunks(await self._split_documents(documents))
             
             # Add to vector store
-            await self._add_to_vectorstore(chunks)
+            await self._add_to_vectorstore(chunks, batch_size)
             
             logger.info(f"Successfully ingested {len(chunks)} document chunks")
             return len(chunks)
@@ -309,18 +456,47 @@ class RAGPipeline:
         logger.info(f"Split {len(documents)} documents into {len(chunks)} chunks")
         return chunks
     
-    async def _add_to_vectorstore(self, chunks: List[Document]) -> None:
+    def _deduplicate_chunks(self, chunks: List[Document]) -> List[Document]:
+        """Drop chunks whose normalized text was already seen, keeping the first."""
+        
+        seen = set()
+        unique_chunks = []
+        
+        for chunk in chunks:
+            # Case- and whitespace-insensitive key, so reflowed copies collapse too
+            normalized = " ".join(chunk.page_content.casefold().split())
+            digest = hashlib.sha256(normalized.encode("utf-8")).digest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            unique_chunks.append(chunk)
+        
+        if len(unique_chunks) < len(chunks):
+            logger.info(f"Dropped {len(chunks) - len(unique_chunks)} duplicate chunks before embedding")
+        return unique_chunks
+    
+    async def _add_to_vectorstore(self, chunks: List[Document], batch_size: Optional[int] = None) -> None:
         """Add document chunks to vector store."""
         
         if self.use_dev_mode:
             self.vectorstore.add_documents(chunks)
         else:
-            # Add to Pinecone in batches to avoid rate limits
-            batch_size = 100
-            for i in range(0, len(chunks), batch_size):
-                batch = chunks[i:i + batch_size]
-                await asyncio.to_thread(self.vectorstore.add_documents, batch)
-                logger.info(f"Added batch {i//batch_size + 1}/{(len(chunks)-1)//batch_size + 1}")
+            # Each add_documents call embeds its whole batch in one
+            # embed_documents request, then upserts it to Pinecone; a few
+            # batches are kept in flight so round trips overlap
+            batch_size = batch_size or EMBED_BATCH_SIZE
+            total_batches = (len(chunks) - 1) // batch_size + 1
+            semaphore = asyncio.Semaphore(UPSERT_CONCURRENCY)
+            
+            async def add_batch(batch_number: int, batch: List[Document]) -> None:
+                async with semaphore:
+                    await asyncio.to_thread(self.vectorstore.add_documents, batch)
+                logger.info(f"Added batch {batch_number}/{total_batches}")
+            
+            await asyncio.gather(*(
+                add_batch(i // batch_size + 1, chunks[i:i + batch_size])
+                for i in range(0, len(chunks), batch_size)
+            ))
     
     async def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -340,26 +516,39 @@ class RAGPipeline:
                 retriever = self.vectorstore.as_retriever(
                     search_kwargs={"k": top_k}
                 )
-                results = retriever.get_relevant_documents(query)
+                results = [
+                    (doc, getattr(doc, "score", 0.0))  # Some retrievers provide scores
+                    for doc in retriever.get_relevant_documents(query)
+                ]
             else:
-                # Use Pinecone retriever
-                retriever = self.vectorstore.as_retriever(
-                    search_kwargs={"k": top_k}
-                )
+                # Embed once; the vector serves both the cache and Pinecone
+                query_vector = await asyncio.to_thread(self.embeddings.embed_query, query)
+                
+                if self.query_cache is not None:
+                    cached_results = self.query_cache.get(query_vector, top_k)
+                    if cached_results is not None:
+                        logger.info(f"Semantic cache hit for query: {query[:50]}...")
+                        return cached_results
+                
+                # PineconeVectorStore only implements the scored by-vector search
                 results = await asyncio.to_thread(
-                    retriever.get_relevant_documents, 
-                    query
+                    self.vectorstore.similarity_search_by_vector_with_score,
+                    query_vector,
+                    k=top_k
                 )
             
             # Format results
             formatted_results = []
-            for doc in results:
+            for doc, score in results:
                 formatted_results.append({
                     "text": doc.page_content,
                     "metadata": doc.metadata,
-                    "score": getattr(doc, "score", 0.0)  # Some retrievers provide scores
+                    "score": score
                 })
             
+            if not self.use_dev_mode and self.query_cache is not None:
+                self.query_cache.put(query_vector, top_k, formatted_results)
+            
             logger.info(f"Retrieved {len(formatted_results)} documents for query: {query[:50]}...")
             return formatted_results
             
@@ -411,6 +600,13 @@ class RAGPipeline:
         
         return stats
     
+    async def warm_up(self) -> None:
+        """Embed a trivial text so the embedding client is ready before real work."""
+        
+        # embed_documents bypasses the query embedding cache, so the model is really called
+        await asyncio.to_thread(self.embeddings.embed_documents, ["warm up"])
+        logger.info("RAG pipeline warmed up")
+    
     async def health_check(self) -> Dict[str, Any]:
         """
         Perform health check on the RAG pipeline.
@@ -441,3 +637,16 @@ class RAGPipeline:
             health["error"] = str(e)
         
         return health
+
+
+# Process-wide pipeline, created on first use so every caller shares its clients
+_pipeline: Optional[RAGPipeline] = None
+
+
+def get_pipeline() -> RAGPipeline:
+    """Return the shared RAG pipeline, creating it on first call."""
+    
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = RAGPipeline()
+    return _pipeline
@@ -3,79 +3,84 @@ Simple model validation test - just check that models can be imported and instan
 Quick static checks and schema validation.(mostly import-level and schema-level testing.)
 (Static / unit-level / lightweight , Does not touch the database at all.)
 """
+import logging
 import sys
 import os
 
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(__file__))
 
+logger = logging.getLogger(__name__)
+
+# Mapped attributes each model must expose
+USER_ATTRS = frozenset(['id', 'email', 'hashed_password', 'name', 'role', 'refresh_tokens', 'created_at'])
+CONVERSATION_ATTRS = frozenset(['id', 'user_id', 'title', 'messages_count', 'created_at'])
+MESSAGE_ATTRS = frozenset(['id', 'conversation_id', 'sender', 'content', 'status', 'message_metadata', 'created_at'])
+
 def test_model_imports():
     """Test that all models can be imported without circular import errors."""
     try:
-        print("Testing model imports...")
+        logger.debug("Testing model imports...")
         
         # Test individual model imports
         from app.models.user import User
-        print("+ User model imported successfully")
+        logger.debug("+ User model imported successfully")
         
         from app.models.conversation import Conversation
-        print("+ Conversation model imported successfully")
+        logger.debug("+ Conversation model imported successfully")
         
         from app.models.message import Message
-        print("+ Message model imported successfully")
+        logger.debug("+ Message model imported successfully")
         
         # Test schema imports
         from app.schemas.auth import User as UserSchema, LoginRequest
-        print("+ Auth schemas imported successfully")
+        logger.debug("+ Auth schemas imported successfully")
         
         from app.schemas.chat import Message as MessageSchema, Conversation as ConversationSchema
-        print("+ Chat schemas imported successfully")
+        logger.debug("+ Chat schemas imported successfully")
         
-        print("\n[SUCCESS] All imports successful!")
+        logger.debug("[SUCCESS] All imports successful!")
         return True
         
     except Exception as e:
-        print(f"\n[ERROR] Import failed: {e}")
+        logger.error("[ERROR] Import failed: %s", e)
         return False
 
 def test_model_structure():
     """Test that models have the expected attributes."""
     try:
-        print("\nTesting model structure...")
+        logger.debug("Testing model structure...")
         
         from app.models.user import User
         from app.models.conversation import Conversation
         from app.models.message import Message
         
         # Check User model attributes
-        user_attrs = ['id', 'email', 'hashed_password', 'name', 'role', 'refresh_tokens', 'created_at']
-        for attr in user_attrs:
-            assert hasattr(User, attr), f"User missing attribute: {attr}"
-        print("+ User model has all required attributes")
+        missing = USER_ATTRS.difference(User.__mapper__.attrs.keys())
+        assert not missing, f"User missing attributes: {sorted(missing)}"
+        logger.debug("+ User model has all required attributes")
         
         # Check Conversation model attributes
-        conv_attrs = ['id', 'user_id', 'title', 'messages_count', 'created_at']
-        for attr in conv_attrs:
-            assert hasattr(Conversation, attr), f"Conversation missing attribute: {attr}"
-        print("+ Conversation model has all required attributes")
+        missing = CONVERSATION_ATTRS.difference(Conversation.__mapper__.attrs.keys())
+        assert not missing, f"Conversation missing attributes: {sorted(missing)}"
+        logger.debug("+ Conversation model has all required attributes")
         
         # Check Message model attributes
-        msg_attrs = ['id', 'conversation_id', 'sender', 'content', 'status', 'message_metadata', 'created_at']
-        for attr in msg_attrs:
-            assert hasattr(Message, attr), f"Message missing attribute: {attr}"
-        print("+ Message model has all required attributes")
+        missing = MESSAGE_ATTRS.difference(Message.__mapper__.attrs.keys())
+        assert not missing, f"Message missing attributes: {sorted(missing)}"
+        logger.debug("+ Message model has all required attributes")
         
-        print("\n[SUCCESS] All model structures are correct!")
+        logger.debug("[SUCCESS] All model structures are correct!")
         return True
         
     except Exception as e:
-        print(f"\n[ERROR] Structure test failed: {e}")
+        logger.error("[ERROR] Structure test failed: %s", e)
         return False
 
 def test_schema_validation():
     """Test that Pydantic schemas work correctly."""
     try:
-        print("\nTesting schema validation...")
+        logger.debug("Testing schema validation...")
         
         from app.schemas.auth import UserCreate, LoginRequest
         from app.schemas.chat import MessageCreate, ConversationCreate
@@ -88,7 +93,7 @@ def test_schema_validation():
         }
         user_schema = UserCreate(**user_data)
         assert user_schema.email == "test@example.com"
-        print("+ UserCreate schema validation works")
+        logger.debug("+ UserCreate schema validation works")
         
         # Test LoginRequest schema
         login_data = {
@@ -97,7 +102,7 @@ def test_schema_validation():
         }
         login_schema = LoginRequest(**login_data)
         assert login_schema.email == "test@example.com"
-        print("+ LoginRequest schema validation works")
+        logger.debug("+ LoginRequest schema validation works")
         
         # Test MessageCreate schema
         message_data = {
@@ -106,7 +111,7 @@ def test_schema_validation():
         }
         message_schema = MessageCreate(**message_data)
         assert message_schema.content == "Hello, this is a test message"
-        print("+ MessageCreate schema validation works")
+        logger.debug("+ MessageCreate schema validation works")
         
         # Test ConversationCreate schema
         conv_data = {
@@ -114,16 +119,17 @@ def test_schema_validation():
         }
         conv_schema = ConversationCreate(**conv_data)
         assert conv_schema.title == "Test Conversation"
-        print("+ ConversationCreate schema validation works")
+        logger.debug("+ ConversationCreate schema validation works")
         
-        print("\n[SUCCESS] All schema validations work correctly!")
+        logger.debug("[SUCCESS] All schema validations work correctly!")
         return True
         
     except Exception as e:
-        print(f"\n[ERROR] Schema validation failed: {e}")
+        logger.error("[ERROR] Schema validation failed: %s", e)
         return False
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     print("=== B03 Model and Schema Validation Test ===\n")
     
     success = True
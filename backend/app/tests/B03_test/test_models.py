@@ -4,134 +4,141 @@ This is a temporary test file for B03 validation.
 ORM-level testing with the database.(This is an integration test./ database-aware)
 """
 import asyncio
+import logging
 import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+import pytest_asyncio
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.db.session import AsyncSessionLocal
 from app.models import User, Conversation, Message
 
+logger = logging.getLogger(__name__)
 
-async def test_models():
-    """Test ORM models and relationships."""
-    print("Testing ORM models and relationships...")
-    
+
+@asynccontextmanager
+async def _rollback_session():
+    """Open a session whose transaction is always rolled back, so nothing persists."""
     async with AsyncSessionLocal() as session:
+        await session.begin()
         try:
-            # Test User creation
-            print("\n1. Creating a test user...")
-            user = User(
-                email="test@example.com",
-                name="Test User",
-                hashed_password="hashed_password_here",
-                role="user"
-            )
-            session.add(user)
-            await session.commit()
-            await session.refresh(user)
-            print(f"✓ User created with ID: {user.id}")
-            
-            # Test Conversation creation
-            print("\n2. Creating a test conversation...")
-            conversation = Conversation(
-                user_id=user.id,
-                title="Test Conversation",
-                messages_count=0
-            )
-            session.add(conversation)
-            await session.commit()
-            await session.refresh(conversation)
-            print(f"✓ Conversation created with ID: {conversation.id}")
-            
-            # Test Message creation
-            print("\n3. Creating test messages...")
-            user_message = Message(
-                conversation_id=conversation.id,
-                sender="user",
-                content="Hello, this is a test message from user",
-                status="sent",
-                message_metadata={"type": "text"}
-            )
-            session.add(user_message)
-            
-            assistant_message = Message(
-                conversation_id=conversation.id,
-                sender="assistant",
-                content="Hello! This is a test response from the assistant",
-                status="sent",
-                message_metadata={"type": "text", "disclaimer": True}
-            )
-            session.add(assistant_message)
-            
-            await session.commit()
-            await session.refresh(user_message)
-            await session.refresh(assistant_message)
-            print(f"✓ User message created with ID: {user_message.id}")
-            print(f"✓ Assistant message created with ID: {assistant_message.id}")
-            
-            # Update conversation message count
-            conversation.messages_count = 2
-            await session.commit()
-            
-            # Test relationships - User -> Conversations
-            print("\n4. Testing relationships...")
-            result = await session.execute(
-                select(User).options(selectinload(User.conversations)).where(User.id == user.id)
-            )
-            user_with_conversations = result.scalar_one()
-            print(f"✓ User has {len(user_with_conversations.conversations)} conversation(s)")
-            
-            # Test relationships - Conversation -> Messages
-            result = await session.execute(
-                select(Conversation).options(selectinload(Conversation.messages)).where(Conversation.id == conversation.id)
-            )
-            conversation_with_messages = result.scalar_one()
-            print(f"✓ Conversation has {len(conversation_with_messages.messages)} message(s)")
-            
-            # Test relationships - Message -> Conversation -> User
-            result = await session.execute(
-                select(Message)
-                .options(selectinload(Message.conversation).selectinload(Conversation.user))
-                .where(Message.id == user_message.id)
-            )
-            message_with_relations = result.scalar_one()
-            print(f"✓ Message belongs to user: {message_with_relations.conversation.user.email}")
-            
-            # Test querying messages by conversation
-            print("\n5. Testing queries...")
-            result = await session.execute(
-                select(Message).where(Message.conversation_id == conversation.id).order_by(Message.created_at)
-            )
-            messages = result.scalars().all()
-            print(f"✓ Found {len(messages)} messages in conversation")
-            for i, msg in enumerate(messages, 1):
-                print(f"  {i}. {msg.sender}: {msg.content[:50]}...")
-            
-            # Test cascade delete (cleanup)
-            print("\n6. Testing cascade delete...")
-            await session.delete(user)  # This should cascade delete conversations and messages
-            await session.commit()
-            print("✓ User deleted (cascade delete should remove conversations and messages)")
-            
-            # Verify cascade delete worked
-            result = await session.execute(select(Conversation).where(Conversation.id == conversation.id))
-            remaining_conversation = result.scalar_one_or_none()
-            
-            result = await session.execute(select(Message).where(Message.id == user_message.id))
-            remaining_message = result.scalar_one_or_none()
-            
-            if remaining_conversation is None and remaining_message is None:
-                print("✓ Cascade delete successful - conversations and messages removed")
-            else:
-                print("✗ Cascade delete failed - some records remain")
-            
-            print("\n✅ All tests passed! Models and relationships are working correctly.")
-            
-        except Exception as e:
-            print(f"\n❌ Test failed with error: {e}")
+            yield session
+        finally:
             await session.rollback()
-            raise
+
+
+@pytest_asyncio.fixture
+async def db_session():
+    """Database session rolled back after the test."""
+    async with _rollback_session() as session:
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_models(db_session):
+    """Test ORM models and relationships."""
+    session = db_session
+    logger.debug("Testing ORM models and relationships...")
+
+    # Build the whole object graph up front; ids come from uuid4 client-side,
+    # so everything is inserted with a single flush
+    logger.debug("1. Creating a test user, conversation and messages...")
+    user = User(
+        id=uuid.uuid4(),
+        email="test@example.com",
+        name="Test User",
+        hashed_password="hashed_password_here",
+        role="user"
+    )
+    conversation = Conversation(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        title="Test Conversation",
+        messages_count=2
+    )
+    user_message = Message(
+        id=uuid.uuid4(),
+        conversation_id=conversation.id,
+        sender="user",
+        content="Hello, this is a test message from user",
+        status="sent",
+        message_metadata={"type": "text"}
+    )
+    assistant_message = Message(
+        id=uuid.uuid4(),
+        conversation_id=conversation.id,
+        sender="assistant",
+        content="Hello! This is a test response from the assistant",
+        status="sent",
+        message_metadata={"type": "text", "disclaimer": True}
+    )
+    session.add_all([user, conversation, user_message, assistant_message])
+    await session.flush()
+    logger.debug("✓ User created with ID: %s", user.id)
+    logger.debug("✓ Conversation created with ID: %s", conversation.id)
+    logger.debug("✓ User message created with ID: %s", user_message.id)
+    logger.debug("✓ Assistant message created with ID: %s", assistant_message.id)
+
+    # Test relationships - User -> Conversations
+    logger.debug("2. Testing relationships...")
+    result = await session.execute(
+        select(User).options(selectinload(User.conversations)).where(User.id == user.id)
+    )
+    user_with_conversations = result.scalar_one()
+    logger.debug("✓ User has %s conversation(s)", len(user_with_conversations.conversations))
+
+    # Test relationships - Conversation -> Messages
+    result = await session.execute(
+        select(Conversation).options(selectinload(Conversation.messages)).where(Conversation.id == conversation.id)
+    )
+    conversation_with_messages = result.scalar_one()
+    logger.debug("✓ Conversation has %s message(s)", len(conversation_with_messages.messages))
+
+    # Test relationships - Message -> Conversation -> User
+    result = await session.execute(
+        select(Message)
+        .options(selectinload(Message.conversation).selectinload(Conversation.user))
+        .where(Message.id == user_message.id)
+    )
+    message_with_relations = result.scalar_one()
+    logger.debug("✓ Message belongs to user: %s", message_with_relations.conversation.user.email)
+
+    # Test querying messages by conversation
+    logger.debug("3. Testing queries...")
+    result = await session.execute(
+        select(Message).where(Message.conversation_id == conversation.id).order_by(Message.created_at)
+    )
+    messages = result.scalars().all()
+    logger.debug("✓ Found %s messages in conversation", len(messages))
+    for i, msg in enumerate(messages, 1):
+        logger.debug("  %s. %s: %s...", i, msg.sender, msg.content[:50])
+
+    # Test cascade delete inside the same transaction; the fixture rolls it back
+    logger.debug("4. Testing cascade delete...")
+    await session.delete(user)  # This should cascade delete conversations and messages
+    await session.flush()
+    logger.debug("✓ User deleted (cascade delete should remove conversations and messages)")
+
+    # Verify cascade delete worked
+    remaining_conversation = await session.get(Conversation, conversation.id)
+    remaining_message = await session.get(Message, user_message.id)
+    assert remaining_conversation is None and remaining_message is None, (
+        "Cascade delete failed - some records remain"
+    )
+    logger.debug("✓ Cascade delete successful - conversations and messages removed")
+
+    logger.debug("✅ All tests passed! Models and relationships are working correctly.")
+
+
+async def _main():
+    """Run the check standalone against the configured database."""
+    async with _rollback_session() as session:
+        await test_models(session)
 
 
 if __name__ == "__main__":
-    asyncio.run(test_models())
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    asyncio.run(_main())
@@ -5,25 +5,60 @@ Pytest configuration and fixtures for B10 comprehensive test suite.
 import pytest
 import pytest_asyncio
 import asyncio
+import os
 from typing import AsyncGenerator, Generator
 from httpx import AsyncClient, ASGITransport
+from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
-from sqlalchemy import TypeDecorator, CHAR, text
+from sqlalchemy import TypeDecorator, CHAR, text, create_engine, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 import uuid
-import tempfile
-import shutil
+import hashlib
+from functools import lru_cache
 from pathlib import Path
 
 from app.main import app
 from app.db.base import Base
 from app.db.session import get_db
+from app.models.user import User
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.core import security
+from app.core.security import create_access_token
 from app.services.llm_provider import LLMProvider
 
 
-# Test database URL (use in-memory SQLite for speed)
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+# Test database URL (use in-memory SQLite for speed).
+# Keyed on the pytest-xdist worker id so `pytest -n auto` gives every worker
+# its own isolated in-memory database.
+XDIST_WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "main")
+TEST_DATABASE_URL = (
+    f"sqlite+aiosqlite:///file:veda_{XDIST_WORKER_ID}?mode=memory&cache=shared&uri=true"
+)
+
+# Lowest bcrypt cost passlib accepts; used wherever real bcrypt still runs.
+BCRYPT_TEST_ROUNDS = 4
+
+# Plain sqlite3 URL for the synchronous CRUD tests (no aiosqlite thread hop).
+# The API tests have to stay on aiosqlite: create_async_engine only accepts an
+# asyncio DBAPI, and the routes under test depend on AsyncSession.
+SYNC_TEST_DATABASE_URL = "sqlite://"
+
+# Session-wide fixture users; db_session cleanup leaves these rows in place
+TEST_USER_EMAIL = "test@example.com"
+ADMIN_USER_EMAIL = "admin@example.com"
+
+# Session-wide conversation shared by the API tests; fresh id every run
+TEST_CONVERSATION_ID = uuid.uuid4()
+
+
+@lru_cache(maxsize=4096)
+def _to_uuid(value: str) -> uuid.UUID:
+    """Parse a stored CHAR(36) id once; the same few ids are read back constantly."""
+    return uuid.UUID(value)
 
 
 # SQLite UUID type decorator
@@ -58,25 +93,84 @@ class GUID(TypeDecorator):
             if isinstance(value, uuid.UUID):
                 return value
             else:
-                return uuid.UUID(value)
+                return _to_uuid(value)
+
+
+_DELETE_NON_FIXTURE_USERS = text(
+    "DELETE FROM users WHERE email NOT IN (:test_email, :admin_email)"
+).bindparams(test_email=TEST_USER_EMAIL, admin_email=ADMIN_USER_EMAIL)
+
+_DELETE_NON_FIXTURE_CONVERSATIONS = text(
+    "DELETE FROM conversations WHERE id != :conversation_id"
+).bindparams(conversation_id=str(TEST_CONVERSATION_ID))
+
+# Per-test cleanup, children first
+_CLEANUP_STATEMENTS = (
+    text("DELETE FROM messages"),
+    _DELETE_NON_FIXTURE_CONVERSATIONS,
+    _DELETE_NON_FIXTURE_USERS,
+)
+
+
+# PostgreSQL UUID columns that need the GUID shim on SQLite, collected once at import
+_UUID_COLUMNS = [
+    column
+    for table in Base.metadata.tables.values()
+    for column in table.columns
+    if isinstance(column.type, PG_UUID)
+]
+
+
+def _patch_uuid_columns():
+    """Replace PostgreSQL UUID column types with GUID so tables build on SQLite."""
+    for column in _UUID_COLUMNS:
+        column.type = GUID()
+
+
+# Patch at import, before any test module builds statements against the models
+_patch_uuid_columns()
+
+
+def _fast_password_hash(password: str) -> str:
+    """Cheap stand-in for bcrypt used by the API-level tests."""
+    return "sha256$" + hashlib.sha256(password.encode()).hexdigest()
 
 
-@pytest.fixture(scope="module")
+def _fast_verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password hashed with _fast_password_hash."""
+    return hashed_password == _fast_password_hash(plain_password)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _fast_hash():
+    """Swap bcrypt for a SHA-256 digest on the register/login path.
+    
+    Only the names imported into app.crud.user are patched, so the unit tests
+    in test_unit.TestPasswordHashing still exercise real bcrypt through
+    app.core.security, at BCRYPT_TEST_ROUNDS instead of the production cost.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("app.crud.user.get_password_hash", _fast_password_hash)
+        mp.setattr("app.crud.user.verify_password", _fast_verify_password)
+        mp.setattr(
+            security,
+            "pwd_context",
+            security.pwd_context.copy(bcrypt__rounds=BCRYPT_TEST_ROUNDS),
+        )
+        yield
+
+
+@pytest.fixture(scope="session")
 def event_loop():
-    """Create an event loop for the test module."""
+    """Create an event loop shared by the whole test session."""
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
 
 
-@pytest_asyncio.fixture(scope="module")
+@pytest_asyncio.fixture(scope="session")
 async def db_engine():
     """Create a test database engine."""
-    # Import all models to ensure they're registered with Base.metadata
-    from app.models.user import User
-    from app.models.conversation import Conversation
-    from app.models.message import Message
-    
     # Use StaticPool to ensure same connection is reused for in-memory database
     engine = create_async_engine(
         TEST_DATABASE_URL,
@@ -85,14 +179,7 @@ async def db_engine():
         connect_args={"check_same_thread": False},
     )
     
-    # Monkey-patch all UUID columns to use GUID for SQLite
     async with engine.begin() as conn:
-        # Before creating tables, replace UUID types with GUID
-        for table in Base.metadata.tables.values():
-            for column in table.columns:
-                if hasattr(column.type, '__class__') and column.type.__class__.__name__ == 'UUID':
-                    column.type = GUID()
-        
         await conn.run_sync(Base.metadata.create_all)
     
     yield engine
@@ -115,139 +202,228 @@ async def db_session(db_engine) -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
         
-        # Clean up all data within the same session
-        try:
-            await session.execute(text("DELETE FROM messages"))
-            await session.execute(text("DELETE FROM conversations"))
-            await session.execute(text("DELETE FROM users"))
-            await session.commit()
-        except Exception:
-            # If there's an error (e.g., from a failed test), rollback first
-            await session.rollback()
-            # Try cleanup again
-            try:
-                await session.execute(text("DELETE FROM messages"))
-                await session.execute(text("DELETE FROM conversations"))
-                await session.execute(text("DELETE FROM users"))
-                await session.commit()
-            except Exception:
-                # If cleanup still fails, just rollback and continue
-                await session.rollback()
-
-
-@pytest_asyncio.fixture(scope="function")
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create a test client with database session override."""
-    
-    async def override_get_db():
-        yield db_session
+        # Discard anything a failed test left open, then wipe test data
+        await session.rollback()
+        for statement in _CLEANUP_STATEMENTS:
+            await session.execute(statement)
+        await session.commit()
+
+
+@pytest.fixture(scope="session")
+def sync_db_engine():
+    """Create a synchronous test database engine for the pure-CRUD tests."""
+    engine = create_engine(
+        SYNC_TEST_DATABASE_URL,
+        echo=False,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
     
-    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.create_all(engine)
     
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-        follow_redirects=True  # Follow 307 redirects automatically
-    ) as test_client:
-        yield test_client
+    yield engine
     
-    app.dependency_overrides.clear()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
 
 
-@pytest_asyncio.fixture
-async def test_user(db_session: AsyncSession):
-    """Create a test user."""
-    from app.models.user import User
-    from app.core.security import get_password_hash
-    from sqlalchemy import select
-    
-    # Check if user already exists
-    result = await db_session.execute(
-        select(User).where(User.email == "test@example.com")
+@pytest.fixture(scope="function")
+def sync_db_session(sync_db_engine) -> Generator[Session, None, None]:
+    """Create a synchronous test database session."""
+    session_factory = sessionmaker(
+        bind=sync_db_engine,
+        expire_on_commit=False,
     )
-    existing_user = result.scalar_one_or_none()
-    
-    if existing_user:
-        return existing_user
     
+    with session_factory() as session:
+        yield session
+        
+        # A failed test may leave the transaction aborted
+        session.rollback()
+        session.execute(text("DELETE FROM messages"))
+        session.execute(text("DELETE FROM conversations"))
+        session.execute(text("DELETE FROM users"))
+        session.commit()
+
+
+@pytest.fixture
+def sync_test_user(sync_db_session: Session):
+    """Create a test user through the synchronous session."""
     user = User(
         email="test@example.com",
-        hashed_password=get_password_hash("testpassword123"),
+        hashed_password=_fast_password_hash("testpassword123"),
         name="Test User",
         role="user"
     )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
+    sync_db_session.add(user)
+    sync_db_session.commit()
     return user
 
 
-@pytest_asyncio.fixture
-async def admin_user(db_session: AsyncSession):
-    """Create an admin user."""
-    from app.models.user import User
-    from app.core.security import get_password_hash
-    from sqlalchemy import select
+@pytest.fixture
+def sync_test_conversation(sync_db_session: Session, sync_test_user):
+    """Create a test conversation through the synchronous session."""
+    conversation = Conversation(
+        user_id=sync_test_user.id,
+        title="Test Conversation"
+    )
+    sync_db_session.add(conversation)
+    sync_db_session.commit()
+    return conversation
+
+
+@pytest.fixture
+def sync_test_message(sync_db_session: Session, sync_test_conversation):
+    """Create a test message through the synchronous session."""
+    message = Message(
+        conversation_id=sync_test_conversation.id,
+        sender="user",
+        content="Test message content",
+        status="sent"
+    )
+    sync_db_session.add(message)
+    sync_db_session.commit()
+    return message
+
+
+@pytest_asyncio.fixture(scope="session")
+async def _client() -> AsyncGenerator[AsyncClient, None]:
+    """Create one ASGI test client reused by every test in the session."""
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+        follow_redirects=True  # Follow 307 redirects automatically
+    ) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def ws_client() -> Generator[TestClient, None, None]:
+    """Run the app lifespan once and share the WebSocket test client."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest_asyncio.fixture(scope="function")
+async def client(
+    _client: AsyncClient, db_engine, db_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """Provide the shared test client with a test database override.
     
-    # Check if user already exists
-    result = await db_session.execute(
-        select(User).where(User.email == "admin@example.com")
+    Like get_db, every request gets its own session. The sessions all run
+    over the one StaticPool connection, so their transactions are not
+    isolated: send requests one at a time, not with asyncio.gather.
+    Depending on db_session keeps its per-test cleanup running after the test.
+    """
+    async_session = async_sessionmaker(
+        bind=db_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
     )
-    existing_user = result.scalar_one_or_none()
     
-    if existing_user:
-        return existing_user
+    async def override_get_db():
+        async with async_session() as session:
+            yield session
     
-    user = User(
-        email="admin@example.com",
-        hashed_password=get_password_hash("adminpassword123"),
-        name="Admin User",
-        role="admin"
+    app.dependency_overrides[get_db] = override_get_db
+    
+    yield _client
+    
+    app.dependency_overrides.clear()
+
+
+async def _provision_user(engine, email: str, password: str, name: str, role: str):
+    """Insert a fixture user once (no-op if present) and return the stored row."""
+    async_session = async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
     )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
+    
+    async with async_session() as session:
+        await session.execute(
+            sqlite_insert(User)
+            .values(
+                id=uuid.uuid4(),
+                email=email,
+                hashed_password=_fast_password_hash(password),
+                name=name,
+                role=role
+            )
+            .on_conflict_do_nothing(index_elements=["email"])
+        )
+        await session.commit()
+        
+        result = await session.execute(select(User).where(User.email == email))
+        return result.scalar_one()
 
 
-@pytest_asyncio.fixture
-async def auth_headers(test_user):
+@pytest_asyncio.fixture(scope="session")
+async def test_user(db_engine):
+    """Create the test user once for the whole session."""
+    return await _provision_user(
+        db_engine, TEST_USER_EMAIL, "testpassword123", "Test User", "user"
+    )
+
+
+@pytest_asyncio.fixture(scope="session")
+async def admin_user(db_engine):
+    """Create the admin user once for the whole session."""
+    return await _provision_user(
+        db_engine, ADMIN_USER_EMAIL, "adminpassword123", "Admin User", "admin"
+    )
+
+
+@pytest_asyncio.fixture(scope="session")
+async def user_token(test_user):
+    """Mint the test user's access token once for the whole session."""
+    return create_access_token(data={"sub": str(test_user.id)})
+
+
+@pytest_asyncio.fixture(scope="session")
+async def admin_token(admin_user):
+    """Mint the admin user's access token once for the whole session."""
+    return create_access_token(data={"sub": str(admin_user.id)})
+
+
+@pytest_asyncio.fixture(scope="session")
+async def auth_headers(user_token):
     """Generate authentication headers for test user."""
-    from app.core.security import create_access_token
-    
-    access_token = create_access_token(data={"sub": str(test_user.id)})
-    return {"Authorization": f"Bearer {access_token}"}
+    return {"Authorization": f"Bearer {user_token}"}
 
 
-@pytest_asyncio.fixture
-async def admin_auth_headers(admin_user):
+@pytest_asyncio.fixture(scope="session")
+async def admin_auth_headers(admin_token):
     """Generate authentication headers for admin user."""
-    from app.core.security import create_access_token
-    
-    access_token = create_access_token(data={"sub": str(admin_user.id)})
-    return {"Authorization": f"Bearer {access_token}"}
+    return {"Authorization": f"Bearer {admin_token}"}
 
 
-@pytest_asyncio.fixture
-async def test_conversation(db_session: AsyncSession, test_user):
-    """Create a test conversation."""
-    from app.models.conversation import Conversation
+@pytest_asyncio.fixture(scope="session")
+async def test_conversation(db_engine, test_user):
+    """Create the test conversation once for the whole session.
     
-    conversation = Conversation(
-        user_id=test_user.id,
-        title="Test Conversation"
+    Per-test cleanup removes its messages but keeps the row itself.
+    """
+    async_session = async_sessionmaker(
+        bind=db_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
     )
-    db_session.add(conversation)
-    await db_session.commit()
-    await db_session.refresh(conversation)
-    return conversation
+    
+    async with async_session() as session:
+        conversation = Conversation(
+            id=TEST_CONVERSATION_ID,
+            user_id=test_user.id,
+            title="Test Conversation"
+        )
+        session.add(conversation)
+        await session.commit()
+        return conversation
 
 
 @pytest_asyncio.fixture
 async def test_message(db_session: AsyncSession, test_conversation):
     """Create a test message."""
-    from app.models.message import Message
-    
     message = Message(
         conversation_id=test_conversation.id,
         sender="user",
@@ -256,47 +432,55 @@ async def test_message(db_session: AsyncSession, test_conversation):
     )
     db_session.add(message)
     await db_session.commit()
-    await db_session.refresh(message)
     return message
 
 
 @pytest.fixture
-def tmp_upload_dir():
-    """Create a temporary upload directory."""
-    tmp_dir = Path(tempfile.mkdtemp())
-    yield tmp_dir
-    shutil.rmtree(tmp_dir, ignore_errors=True)
+def tmp_upload_dir(tmp_path: Path) -> Path:
+    """Temporary upload directory (pytest's tmp_path handles cleanup)."""
+    return tmp_path
 
 
-@pytest.fixture
-def mock_llm_provider(monkeypatch):
-    """Mock LLM provider for testing without actual model calls."""
+# Token-sized mock chunks merged into one streamed frame; kept small so
+# every mock reply, even "Mock streaming: input", spans several frames
+MOCK_CHUNKS_PER_FRAME = 2
+
+
+class MockLLMProvider:
+    """Stateless canned-response stand-in for LLMProvider."""
     
-    class MockLLMProvider:
-        async def process_pipeline(self, audio=None, text=None, image=None, opts=None, 
-                                  user_id=None, conversation_id=None):
-            """Return canned response."""
-            if text:
-                return f"Mock response to: {text}"
-            elif audio:
-                return "Mock response to audio input"
-            elif image:
-                return "Mock response to image input"
-            return "Mock default response"
-        
-        async def stream_response(self, text, callback):
-            """Stream mock response in chunks."""
-            response = f"Mock streaming response to: {text}"
-            chunk_size = 10
-            for i in range(0, len(response), chunk_size):
-                await callback(response[i:i+chunk_size])
-        
-        async def process_pipeline_stream(self, audio=None, text=None, image=None,
-                                         user_id=None, conversation_id=None):
-            """Stream mock response chunks."""
-            response = f"Mock streaming: {text or 'input'}"
-            chunk_size = 10
-            for i in range(0, len(response), chunk_size):
-                yield response[i:i+chunk_size]
+    async def process_pipeline(self, audio=None, text=None, image=None, opts=None, 
+                              user_id=None, conversation_id=None):
+        """Return canned response."""
+        if text:
+            return f"Mock response to: {text}"
+        elif audio:
+            return "Mock response to audio input"
+        elif image:
+            return "Mock response to image input"
+        return "Mock default response"
+    
+    async def stream_response(self, text, callback):
+        """Stream mock response in chunks."""
+        response = f"Mock streaming response to: {text}"
+        chunk_size = 10
+        for i in range(0, len(response), chunk_size):
+            await callback(response[i:i+chunk_size])
     
+    async def process_pipeline_stream(self, audio=None, text=None, image=None,
+                                     user_id=None, conversation_id=None):
+        """Stream mock response chunks.
+        
+        Up to MOCK_CHUNKS_PER_FRAME token-sized chunks are merged into each
+        yield, so the WebSocket path sends one frame per batch.
+        """
+        response = f"Mock streaming: {text or 'input'}"
+        frame_size = 10 * MOCK_CHUNKS_PER_FRAME
+        for i in range(0, len(response), frame_size):
+            yield response[i:i+frame_size]
+
+
+@pytest.fixture(scope="session")
+def mock_llm_provider():
+    """Mock LLM provider for testing without actual model calls."""
     return MockLLMProvider()
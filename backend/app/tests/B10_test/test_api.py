@@ -2,9 +2,26 @@
 B10 Integration Tests - API Endpoints
 """
 
+import json
+
 import pytest
 from httpx import AsyncClient
 
+from app.models.conversation import Conversation
+
+
+# Pre-serialized request bodies for the login endpoint (posted by several tests)
+_JSON_HEADERS = {"content-type": "application/json"}
+_LOGIN_BODY = json.dumps(
+    {"email": "test@example.com", "password": "testpassword123"}
+).encode()
+_LOGIN_WRONG_PASSWORD_BODY = json.dumps(
+    {"email": "test@example.com", "password": "wrongpassword"}
+).encode()
+_LOGIN_NONEXISTENT_BODY = json.dumps(
+    {"email": "notexist@test.com", "password": "password123"}
+).encode()
+
 
 @pytest.mark.asyncio
 class TestAuthEndpoints:
@@ -45,10 +62,8 @@ class TestAuthEndpoints:
         """Test successful login."""
         response = await client.post(
             "/api/auth/login",
-            json={
-                "email": test_user.email,
-                "password": "testpassword123"
-            }
+            content=_LOGIN_BODY,
+            headers=_JSON_HEADERS
         )
         
         assert response.status_code == 200
@@ -61,10 +76,8 @@ class TestAuthEndpoints:
         """Test login with wrong password fails."""
         response = await client.post(
             "/api/auth/login",
-            json={
-                "email": test_user.email,
-                "password": "wrongpassword"
-            }
+            content=_LOGIN_WRONG_PASSWORD_BODY,
+            headers=_JSON_HEADERS
         )
         
         assert response.status_code == 401
@@ -73,10 +86,8 @@ class TestAuthEndpoints:
         """Test login with non-existent user fails."""
         response = await client.post(
             "/api/auth/login",
-            json={
-                "email": "notexist@test.com",
-                "password": "password123"
-            }
+            content=_LOGIN_NONEXISTENT_BODY,
+            headers=_JSON_HEADERS
         )
         
         assert response.status_code == 401
@@ -104,10 +115,8 @@ class TestAuthEndpoints:
         # First login to get refresh token
         login_response = await client.post(
             "/api/auth/login",
-            json={
-                "email": test_user.email,
-                "password": "testpassword123"
-            }
+            content=_LOGIN_BODY,
+            headers=_JSON_HEADERS
         )
         refresh_token = login_response.json()["refresh_token"]
         
@@ -176,13 +185,10 @@ class TestConversationEndpoints:
     
     async def test_delete_conversation(self, client: AsyncClient, auth_headers, test_user, db_session):
         """Test deleting a conversation."""
-        from app.models.conversation import Conversation
-        
         # Create a conversation to delete
         conv = Conversation(user_id=test_user.id, title="Delete Me")
         db_session.add(conv)
         await db_session.commit()
-        await db_session.refresh(conv)
         
         response = await client.delete(
             f"/api/conversations/{conv.id}",
@@ -195,13 +201,10 @@ class TestConversationEndpoints:
         self, client: AsyncClient, auth_headers, admin_user, db_session
     ):
         """Test that users cannot access other users' conversations."""
-        from app.models.conversation import Conversation
-        
         # Create conversation for admin user
         admin_conv = Conversation(user_id=admin_user.id, title="Admin Conv")
         db_session.add(admin_conv)
         await db_session.commit()
-        await db_session.refresh(admin_conv)
         
         # Try to access with regular user auth
         response = await client.get(
@@ -34,6 +34,8 @@ class TestModerationAPI:
         self, client: AsyncClient, auth_headers, test_conversation
     ):
         """Test that high severity content is blocked."""
+        url = f"/api/{test_conversation.id}/messages"
+        
         # Test phrases that should definitely be blocked (match high severity keywords)
         dangerous_phrases = [
             "I want to kill myself",
@@ -44,24 +46,24 @@ class TestModerationAPI:
         
         for phrase in dangerous_phrases:
             response = await client.post(
-                f"/api/{test_conversation.id}/messages",
+                url,
                 headers=auth_headers,
                 json={"content": phrase}
             )
             
             # Should be blocked with 400 status
             assert response.status_code == 400, f"Expected 400 for '{phrase}', got {response.status_code}"
-            data = response.json()
+            body = response.content
             
-            # Verify error structure
-            assert "detail" in data
-            detail = data["detail"]
-            assert "error" in detail or "blocked" in str(detail).lower()
+            # Verify error structure (raw bytes, no JSON decode needed)
+            assert b'"detail"' in body
+            assert b'"error"' in body or b"blocked" in body.lower()
     
     async def test_medium_severity_content_flagged(
         self, client: AsyncClient, auth_headers, test_conversation
     ):
         """Test that medium severity content is flagged but allowed."""
+        url = f"/api/{test_conversation.id}/messages"
         flagged_phrases = [
             "Can I buy prescription drugs without a prescription?",
             "Is it safe to mix these medications?"
@@ -69,7 +71,7 @@ class TestModerationAPI:
         
         for phrase in flagged_phrases:
             response = await client.post(
-                f"/api/{test_conversation.id}/messages",
+                url,
                 headers=auth_headers,
                 json={"content": phrase}
             )
@@ -85,6 +87,7 @@ class TestModerationAPI:
         self, client: AsyncClient, auth_headers, test_conversation
     ):
         """Test that moderation is case-insensitive."""
+        url = f"/api/{test_conversation.id}/messages"
         variations = [
             "SUICIDE",
             "suicide",
@@ -92,22 +95,23 @@ class TestModerationAPI:
             "sUiCiDe"
         ]
         
-        for text in variations:
-            response = await client.post(
-                f"/api/{test_conversation.id}/messages",
-                headers=auth_headers,
-                json={"content": f"I'm thinking about {text}"}
-            )
-            
-            # All should be blocked with 400 status
-            assert response.status_code == 400
-            data = response.json()
-            assert "detail" in data
+        # One message carrying every variation; each must be matched
+        response = await client.post(
+            url,
+            headers=auth_headers,
+            json={"content": f"I'm thinking about {' '.join(variations)}"}
+        )
+        
+        # Should be blocked with 400 status
+        assert response.status_code == 400
+        assert b'"detail"' in response.content
+        assert response.content.count(b'"suicide"') == len(variations)
     
     async def test_partial_word_matching(
         self, client: AsyncClient, auth_headers, test_conversation
     ):
         """Test that partial words don't trigger false positives."""
+        url = f"/api/{test_conversation.id}/messages"
         safe_phrases = [
             "I studied suicide prevention in school",  # discussing academically
             "The drug store is closed",  # 'drug' in different context
@@ -115,7 +119,7 @@ class TestModerationAPI:
         
         for phrase in safe_phrases:
             response = await client.post(
-                f"/api/{test_conversation.id}/messages",
+                url,
                 headers=auth_headers,
                 json={"content": phrase}
             )
@@ -128,7 +132,6 @@ class TestModerationAPI:
 class TestModerationRules:
     """Test moderation rules configuration."""
     
-    @pytest.mark.skip(reason="load_rules function not exposed from moderation service")
     def test_load_moderation_rules(self):
         """Test loading moderation rules from JSON."""
         from app.services.moderation import load_rules
@@ -145,7 +148,6 @@ class TestModerationRules:
         except (ImportError, FileNotFoundError):
             pytest.skip("Moderation rules not implemented or file missing")
     
-    @pytest.mark.skip(reason="load_rules function not exposed from moderation service")
     def test_moderation_rules_format(self):
         """Test moderation rules have correct format."""
         from app.services.moderation import load_rules
@@ -161,6 +163,19 @@ class TestModerationRules:
                 assert all(keyword.islower() for keyword in rules[severity])
         except (ImportError, FileNotFoundError):
             pytest.skip("Moderation rules not implemented")
+    
+    def test_safe_results_are_independent(self):
+        """Test that each passing check gets its own result object."""
+        from app.services.moderation import moderate_content
+        
+        first = moderate_content("I have a mild headache")
+        first.matched_keywords.append("tampered")
+        first.metadata["tampered"] = True
+        second = moderate_content("I have a mild headache")
+        
+        assert first is not second
+        assert second.matched_keywords == []
+        assert second.metadata == {}
 
 
 
@@ -180,12 +195,11 @@ class TestModerationLogging:
         
         # Should be blocked with 400 status
         assert response.status_code == 400
-        data = response.json()
+        body = response.content
         
         # Verify error structure indicates blocking
-        assert "detail" in data
-        detail = data["detail"]
-        assert "blocked" in str(detail).lower() or "error" in detail
+        assert b'"detail"' in body
+        assert b"blocked" in body.lower() or b'"error"' in body
     
     async def test_flagged_content_logged(
         self, client: AsyncClient, auth_headers, test_conversation
@@ -266,9 +280,15 @@ class TestEmergencyModal:
         )
         
         if response.status_code in [400, 403]:
-            data = response.json()
-            # Should include emergency resources
-            response_text = str(data).lower()
+            detail = response.json().get("detail") or {}
+            # Should include emergency resources; read the message fields
+            # directly instead of stringifying the whole payload
+            if isinstance(detail, dict):
+                response_text = (
+                    detail.get("error") or detail.get("message") or ""
+                ).lower()
+            else:
+                response_text = str(detail).lower()
             
             # Check for emergency keywords
             emergency_keywords = ["emergency", "helpline", "crisis", "support"]
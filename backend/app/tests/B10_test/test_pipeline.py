@@ -4,6 +4,16 @@ B10 Pipeline Tests - LLM Provider and Chat Manager
 
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import bindparam, select
+
+from app.models.message import Message
+from app.services.chat_manager import ChatManager
+
+
+# Built once; SQLAlchemy's compiled cache reuses the SQL on every execute
+_STMT_MSG_IDS_BY_CONV = select(Message.id).where(
+    Message.conversation_id == bindparam("cid")
+)
 
 
 @pytest.mark.pipeline
@@ -17,9 +27,7 @@ class TestLLMProvider:
             text="What are symptoms of flu?"
         )
         
-        assert isinstance(result, str)
-        assert len(result) > 0
-        assert "Mock response" in result
+        assert result and "Mock response" in result
     
     async def test_process_pipeline_audio_input(self, mock_llm_provider):
         """Test processing audio input through pipeline."""
@@ -30,8 +38,7 @@ class TestLLMProvider:
             audio=audio_data
         )
         
-        assert isinstance(result, str)
-        assert len(result) > 0
+        assert result and "Mock response" in result
     
     async def test_process_pipeline_image_input(self, mock_llm_provider):
         """Test processing image input through pipeline."""
@@ -42,8 +49,7 @@ class TestLLMProvider:
             image=image_data
         )
         
-        assert isinstance(result, str)
-        assert len(result) > 0
+        assert result and "Mock response" in result
     
     async def test_process_pipeline_with_options(self, mock_llm_provider):
         """Test processing with custom options."""
@@ -66,10 +72,8 @@ class TestLLMProvider:
             callback=collect_chunk
         )
         
-        assert len(chunks) > 0
         # Join chunks should form complete response
-        full_response = "".join(chunks)
-        assert len(full_response) > 0
+        assert chunks and "".join(chunks)
 
 
 @pytest.mark.pipeline
@@ -81,8 +85,6 @@ class TestChatManager:
         self, db_session, test_conversation, test_user, mock_llm_provider
     ):
         """Test handling user text message."""
-        from app.services.chat_manager import ChatManager
-        
         with patch('app.services.chat_manager.LLMProvider', return_value=mock_llm_provider):
             manager = ChatManager(db_session)
             
@@ -103,10 +105,6 @@ class TestChatManager:
         self, db_session, test_conversation, test_user, mock_llm_provider
     ):
         """Test that messages are persisted to database."""
-        from app.services.chat_manager import ChatManager
-        from app.models.message import Message
-        from sqlalchemy import select
-        
         with patch('app.services.chat_manager.LLMProvider', return_value=mock_llm_provider):
             manager = ChatManager(db_session)
             
@@ -118,9 +116,7 @@ class TestChatManager:
             
             # Check messages were saved
             result = await db_session.execute(
-                select(Message).where(
-                    Message.conversation_id == test_conversation.id
-                )
+                _STMT_MSG_IDS_BY_CONV, {"cid": test_conversation.id}
             )
             messages = result.scalars().all()
             
@@ -131,8 +127,6 @@ class TestChatManager:
         self, db_session, test_conversation, test_user, mock_llm_provider
     ):
         """Test handling message with WebSocket streaming."""
-        from app.services.chat_manager import ChatManager
-        
         # Mock WebSocket streamer with AsyncMock
         streamer = AsyncMock()
         streamer.send_chunk = AsyncMock()
@@ -178,6 +172,55 @@ class TestRAGPipeline:
         except ImportError:
             pytest.skip("RAG pipeline not fully implemented")
     
+    async def test_rag_retrieve_production_uses_scored_vector_search(self):
+        """Test the Pinecone branch returns docs and scores from the vector search."""
+        from app.services.rag.pipeline import Document, MockEmbeddings, RAGPipeline, SemanticQueryCache
+        
+        class StubVectorStore:
+            """Only the scored by-vector search, like PineconeVectorStore."""
+            
+            def __init__(self):
+                self.calls = 0
+            
+            def similarity_search_by_vector_with_score(self, embedding, k=4):
+                self.calls += 1
+                return [
+                    (Document(page_content="Document 1", metadata={"source": "doc1"}), 0.91),
+                    (Document(page_content="Document 2", metadata={"source": "doc2"}), 0.87),
+                ][:k]
+        
+        pipeline = RAGPipeline()
+        pipeline.use_dev_mode = False
+        pipeline.embeddings = MockEmbeddings()
+        pipeline.vectorstore = StubVectorStore()
+        pipeline.query_cache = SemanticQueryCache(capacity=4, threshold=0.95)
+        
+        results = await pipeline.retrieve("test query", top_k=2)
+        
+        assert [doc["text"] for doc in results] == ["Document 1", "Document 2"]
+        assert [doc["score"] for doc in results] == [0.91, 0.87]
+        assert results[0]["metadata"] == {"source": "doc1"}
+        
+        # The repeat query is answered from the semantic cache
+        assert await pipeline.retrieve("test query", top_k=2) == results
+        assert pipeline.vectorstore.calls == 1
+    
+    async def test_cached_query_embedding_is_stable(self, tmp_path):
+        """Test a cache miss and a later hit return the same vector."""
+        from app.services.rag.pipeline import CachedQueryEmbeddings, MockEmbeddings
+        
+        class PreciseEmbeddings(MockEmbeddings):
+            def embed_query(self, text):
+                return [0.123456789, -0.987654321, 0.333333333]
+        
+        cache = CachedQueryEmbeddings(PreciseEmbeddings(), "test-model", str(tmp_path / "cache.sqlite"))
+        
+        miss = cache.embed_query("test query")
+        hit = cache.embed_query("test query")
+        
+        assert miss == hit
+        assert miss == pytest.approx([0.123456789, -0.987654321, 0.333333333], abs=1e-3)
+    
     async def test_rag_ingest_documents(self, tmp_upload_dir):
         """Test document ingestion."""
         from app.services.rag.pipeline import RAGPipeline
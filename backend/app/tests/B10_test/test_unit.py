@@ -6,6 +6,8 @@ import pytest
 from datetime import datetime, timedelta
 import bcrypt
 
+from app.services.moderation import moderate_content, moderation_service
+
 
 class TestPasswordHashing:
     """Test password hashing and verification."""
@@ -106,8 +108,6 @@ class TestModeration:
     
     def test_check_content_safe(self):
         """Test safe content passes moderation."""
-        from app.services.moderation import moderate_content
-        
         safe_text = "I have a headache. What should I do?"
         result = moderate_content(safe_text)
         
@@ -117,8 +117,6 @@ class TestModeration:
     
     def test_check_content_high_severity(self):
         """Test high severity content is blocked."""
-        from app.services.moderation import moderate_content
-        
         dangerous_text = "I want to kill myself"
         result = moderate_content(dangerous_text)
         
@@ -129,8 +127,6 @@ class TestModeration:
     
     def test_check_content_medium_severity(self):
         """Test medium severity content is flagged but allowed."""
-        from app.services.moderation import moderate_content
-        
         flagged_text = "Can I take this drug without prescription?"
         result = moderate_content(flagged_text)
         
@@ -141,8 +137,6 @@ class TestModeration:
     
     def test_check_content_case_insensitive(self):
         """Test moderation is case-insensitive."""
-        from app.services.moderation import moderate_content
-        
         text1 = "SUICIDE"
         text2 = "suicide"
         text3 = "SuIcIdE"
@@ -154,6 +148,26 @@ class TestModeration:
         assert result1.is_safe is False
         assert result2.is_safe is False
         assert result3.is_safe is False
+    
+    def test_moderate_batch_matches_single_checks(self):
+        """Test batch moderation gives the same results as per-message checks."""
+        texts = [
+            "I have a headache. What should I do?",
+            "I want to kill myself",
+            "",
+            "Can I take this drug without prescription?",
+            "SUICIDE\nplease help",
+        ]
+        
+        batch = moderation_service.moderate_batch(texts)
+        single = [moderate_content(text) for text in texts]
+        
+        assert len(batch) == len(texts)
+        for batch_result, single_result in zip(batch, single):
+            assert batch_result.is_safe == single_result.is_safe
+            assert batch_result.severity == single_result.severity
+            assert batch_result.matched_keywords == single_result.matched_keywords
+            assert batch_result.action == single_result.action
 
 
 class TestUtilities:
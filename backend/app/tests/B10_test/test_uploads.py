@@ -6,23 +6,51 @@ File upload endpoints have been implemented with secure validation.
 
 import pytest
 from httpx import AsyncClient
-from io import BytesIO
 from pathlib import Path
 
 
+# Minimal payloads: a real magic-byte signature followed by filler
+FAKE_PNG = b'\x89PNG\r\n\x1a\n' + b"fake png data"
+FAKE_JPEG = b'\xff\xd8\xff\xe0' + b"fake jpeg data"
+FAKE_WAV = b'RIFF' + b'\x00' * 4 + b'WAVE' + b"fake wav data"
+FAKE_MP3 = b'\xff\xfb' + b"fake mp3 data"
+
+
+class _GeneratedUpload:
+    """File-like body of ``size`` filler bytes after ``header``, produced on read.
+    
+    httpx streams file-likes in chunks, so large upload tests never hold the
+    whole payload in memory.
+    """
+    
+    def __init__(self, header: bytes, size: int):
+        self._header = header
+        self._remaining = size
+    
+    def read(self, size: int = -1) -> bytes:
+        if self._header:
+            chunk, self._header = self._header, b""
+            return chunk
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        self._remaining -= size
+        return b"x" * size
+
+
 @pytest.mark.asyncio
 class TestImageUpload:
     """Test image upload functionality."""
     
-    async def test_upload_image_png(
-        self, client: AsyncClient, auth_headers, test_conversation, tmp_upload_dir
+    @pytest.mark.parametrize("filename,content_type,payload", [
+        ("test.png", "image/png", FAKE_PNG),
+        ("test.jpg", "image/jpeg", FAKE_JPEG),
+    ])
+    async def test_upload_image(
+        self, client: AsyncClient, auth_headers, filename, content_type, payload
     ):
-        """Test uploading PNG image."""
-        # Create fake PNG header + data
-        fake_image = BytesIO(b'\x89PNG\r\n\x1a\n' + b"fake png data")
-        
+        """Test uploading PNG and JPEG images."""
         files = {
-            "file": ("test.png", fake_image, "image/png")
+            "file": (filename, payload, content_type)
         }
         
         response = await client.post(
@@ -38,33 +66,12 @@ class TestImageUpload:
         assert "url" in result
         assert result["url"].startswith("/uploads/images/")
     
-    async def test_upload_image_jpeg(
-        self, client: AsyncClient, auth_headers, test_conversation
-    ):
-        """Test uploading JPEG image."""
-        # Create fake JPEG header + data
-        fake_image = BytesIO(b'\xff\xd8\xff\xe0' + b"fake jpeg data")
-        
-        files = {
-            "file": ("test.jpg", fake_image, "image/jpeg")
-        }
-        
-        response = await client.post(
-            "/api/upload/image",
-            headers=auth_headers,
-            files=files
-        )
-        
-        assert response.status_code in [200, 201]
-        result = response.json()
-        assert result["success"] is True
-    
     async def test_upload_image_too_large(
         self, client: AsyncClient, auth_headers, test_conversation
     ):
         """Test uploading image that exceeds size limit."""
-        # Create 11MB fake image (exceeds 10MB limit)
-        large_image = BytesIO(b'\x89PNG\r\n\x1a\n' + b"x" * (11 * 1024 * 1024))
+        # Stream an 11MB fake image (exceeds 10MB limit)
+        large_image = _GeneratedUpload(b'\x89PNG\r\n\x1a\n', 11 * 1024 * 1024)
         
         files = {
             "file": ("large.png", large_image, "image/png")
@@ -83,10 +90,8 @@ class TestImageUpload:
         self, client: AsyncClient, auth_headers, test_conversation
     ):
         """Test uploading non-image file as image."""
-        fake_file = BytesIO(b"not an image")
-        
         files = {
-            "file": ("test.txt", fake_file, "text/plain")
+            "file": ("test.txt", b"not an image", "text/plain")
         }
         
         response = await client.post(
@@ -102,11 +107,8 @@ class TestImageUpload:
         self, client: AsyncClient, auth_headers, test_conversation
     ):
         """Test that uploaded image URL is accessible."""
-        # Create fake PNG
-        fake_image = BytesIO(b'\x89PNG\r\n\x1a\n' + b"fake image data")
-        
         files = {
-            "file": ("test.png", fake_image, "image/png")
+            "file": ("test.png", FAKE_PNG, "image/png")
         }
         
         upload_response = await client.post(
@@ -129,15 +131,16 @@ class TestImageUpload:
 class TestAudioUpload:
     """Test audio upload and transcription."""
     
-    async def test_upload_audio_wav(
-        self, client: AsyncClient, auth_headers, test_conversation
+    @pytest.mark.parametrize("filename,content_type,payload", [
+        ("test.wav", "audio/wav", FAKE_WAV),
+        ("test.mp3", "audio/mpeg", FAKE_MP3),
+    ])
+    async def test_upload_audio(
+        self, client: AsyncClient, auth_headers, filename, content_type, payload
     ):
-        """Test uploading WAV audio file."""
-        # Create fake WAV header
-        fake_audio = BytesIO(b'RIFF' + b'\x00' * 4 + b'WAVE' + b"fake wav data")
-        
+        """Test uploading WAV and MP3 audio files."""
         files = {
-            "file": ("test.wav", fake_audio, "audio/wav")
+            "file": (filename, payload, content_type)
         }
         
         response = await client.post(
@@ -151,33 +154,12 @@ class TestAudioUpload:
         result = response.json()
         assert result["success"] is True
     
-    async def test_upload_audio_mp3(
-        self, client: AsyncClient, auth_headers, test_conversation
-    ):
-        """Test uploading MP3 audio file."""
-        # Create fake MP3 header
-        fake_audio = BytesIO(b'\xff\xfb' + b"fake mp3 data")
-        
-        files = {
-            "file": ("test.mp3", fake_audio, "audio/mpeg")
-        }
-        
-        response = await client.post(
-            "/api/upload/audio",
-            headers=auth_headers,
-            files=files
-        )
-        
-        assert response.status_code in [200, 201]
-    
     async def test_audio_transcription_returns_text(
         self, client: AsyncClient, auth_headers, test_conversation, mock_llm_provider
     ):
         """Test that audio upload returns URL (transcription optional)."""
-        fake_audio = BytesIO(b'RIFF' + b'\x00' * 4 + b'WAVE' + b"fake audio data")
-        
         files = {
-            "file": ("test.wav", fake_audio, "audio/wav")
+            "file": ("test.wav", FAKE_WAV, "audio/wav")
         }
         
         response = await client.post(
@@ -213,21 +195,18 @@ class TestFileValidation:
         """Test that executable files are rejected."""
         dangerous_extensions = [".exe", ".dll", ".bat", ".cmd"]
         
+        # Sequential: every request's session shares the one test connection
         for ext in dangerous_extensions:
-            fake_file = BytesIO(b"malicious content")
-            
-            files = {
-                "file": (f"malware{ext}", fake_file, "application/octet-stream")
-            }
-            
             response = await client.post(
                 "/api/upload/image",
                 headers=auth_headers,
-                files=files
+                files={
+                    "file": (f"malware{ext}", b"malicious content", "application/octet-stream")
+                }
             )
             
             # Should reject dangerous files
-            assert response.status_code in [400, 415]
+            assert response.status_code in [400, 415], f"{ext} was not rejected"
     
     async def test_reject_script_files(
         self, client: AsyncClient, auth_headers
@@ -240,20 +219,16 @@ class TestFileValidation:
         ]
         
         for filename, content_type in dangerous_scripts:
-            fake_file = BytesIO(b"malicious script")
-            
-            files = {
-                "file": (filename, fake_file, content_type)
-            }
-            
             response = await client.post(
                 "/api/upload/image",
                 headers=auth_headers,
-                files=files
+                files={
+                    "file": (filename, b"malicious script", content_type)
+                }
             )
             
             # Should reject script files
-            assert response.status_code in [400, 415]
+            assert response.status_code in [400, 415], f"{filename} was not rejected"
     
     def test_sanitize_filename(self):
         """Test filename sanitization."""
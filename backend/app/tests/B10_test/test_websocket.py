@@ -9,10 +9,10 @@ Some tests are marked as integration tests and require actual database setup.
 import pytest
 import json
 from uuid import uuid4
-from fastapi.testclient import TestClient
 
-from app.main import app
-from app.core.security import create_access_token
+from fastapi import status
+from starlette.websockets import WebSocketDisconnect
+
 from app.db.session import get_db
 
 
@@ -21,388 +21,313 @@ from app.db.session import get_db
 # actual WebSocket client libraries or end-to-end testing.
 
 
+def _collect_stream(websocket, max_frames=20):
+    """Read a streamed reply; return the chunk frames and the final frame.
+    
+    Stops at the first "done" or "error" frame (returned as the final frame),
+    or when the connection closes or max_frames is reached (final frame None).
+    """
+    chunks = []
+    for _ in range(max_frames):
+        try:
+            response = websocket.receive_json()
+        except Exception:
+            # Connection closed
+            break
+        if response["type"] == "chunk":
+            chunks.append(response)
+        elif response["type"] in ("done", "error"):
+            return chunks, response
+    return chunks, None
+
+
 @pytest.mark.websocket
 @pytest.mark.integration
 @pytest.mark.skip(reason="WebSocket tests require special database setup - TestClient creates separate app instance")
+@pytest.mark.xdist_group(name="ws_connection")
 @pytest.mark.asyncio
 class TestWebSocketConnection:
     """Test WebSocket connection establishment and authentication."""
     
-    async def test_connect_with_valid_token(self, test_user, test_conversation):
+    async def test_connect_with_valid_token(self, ws_client, user_token, test_conversation):
         """Test successful WebSocket connection with valid JWT token."""
-        # Create access token for test user
-        access_token = create_access_token(data={"sub": str(test_user.id)})
-        
-        # Use TestClient for WebSocket
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Connection successful if we get here
-                assert websocket.client_state.name == "CONNECTED"
-                
-                # Send ping to verify connection is working
-                websocket.send_json({"type": "ping"})
-                response = websocket.receive_json()
-                assert response["type"] == "pong"
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Connection successful if we get here
+            assert websocket.client_state.name == "CONNECTED"
+            
+            # Send ping to verify connection is working
+            websocket.send_json({"type": "ping"})
+            response = websocket.receive_json()
+            assert response["type"] == "pong"
     
-    async def test_connect_without_token_fails(self, test_conversation):
+    async def test_connect_without_token_fails(self, ws_client, test_conversation):
         """Test WebSocket connection fails without token."""
-        with TestClient(app) as test_client:
-            with pytest.raises(Exception):  # Should raise WebSocket error
-                with test_client.websocket_connect(
-                    f"/ws/conversations/{test_conversation.id}"
-                ):
-                    pass
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with ws_client.websocket_connect(
+                f"/ws/conversations/{test_conversation.id}"
+            ):
+                pass
+        # Missing required query parameter: policy violation
+        assert exc_info.value.code == status.WS_1008_POLICY_VIOLATION
     
-    async def test_connect_with_invalid_token_fails(self, test_conversation):
+    async def test_connect_with_invalid_token_fails(self, ws_client, test_conversation):
         """Test WebSocket connection fails with invalid token."""
         invalid_token = "invalid.jwt.token"
         
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with ws_client.websocket_connect(
                 f"/ws/conversations/{test_conversation.id}?token={invalid_token}"
-            ) as websocket:
-                # Connection should close with authentication error
-                # Server closes with code 4001
-                try:
-                    data = websocket.receive()
-                except:
-                    pass
-                assert websocket.client_state.name == "DISCONNECTED"
+            ):
+                pass
+        # Server closes with authentication error
+        assert exc_info.value.code == 4001
     
-    async def test_connect_to_nonexistent_conversation(self, test_user):
+    async def test_connect_to_nonexistent_conversation(self, ws_client, user_token):
         """Test WebSocket connection fails for non-existent conversation."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
         fake_conversation_id = str(uuid4())
         
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{fake_conversation_id}?token={access_token}"
-            ) as websocket:
-                # Server should close connection with error code
-                try:
-                    data = websocket.receive()
-                except:
-                    pass
-                assert websocket.client_state.name == "DISCONNECTED"
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with ws_client.websocket_connect(
+                f"/ws/conversations/{fake_conversation_id}?token={user_token}"
+            ):
+                pass
+        # Server closes with "conversation not found or access denied"
+        assert exc_info.value.code == 4003
     
-    async def test_connect_to_other_user_conversation(self, admin_user, test_conversation):
+    async def test_connect_to_other_user_conversation(self, ws_client, admin_token, test_conversation):
         """Test user cannot connect to another user's conversation."""
-        # Create token for admin user, but try to access test_user's conversation
-        access_token = create_access_token(data={"sub": str(admin_user.id)})
-        
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Server should reject with access denied
-                try:
-                    data = websocket.receive()
-                except:
-                    pass
-                assert websocket.client_state.name == "DISCONNECTED"
+        # Use the admin user's token to access test_user's conversation
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with ws_client.websocket_connect(
+                f"/ws/conversations/{test_conversation.id}?token={admin_token}"
+            ):
+                pass
+        # Server rejects with access denied
+        assert exc_info.value.code == 4003
 
 
 @pytest.mark.websocket
 @pytest.mark.integration
 @pytest.mark.skip(reason="WebSocket tests require special database setup - TestClient creates separate app instance")
+@pytest.mark.xdist_group(name="ws_messaging")
 @pytest.mark.asyncio
 class TestWebSocketMessaging:
     """Test WebSocket message sending and streaming."""
     
-    async def test_send_message_and_receive_stream(self, test_user, test_conversation, mock_llm_provider):
+    async def test_send_message_and_receive_stream(self, ws_client, user_token, test_conversation, mock_llm_provider):
         """Test sending a message and receiving streamed response."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
-        
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send user message
-                client_message_id = str(uuid4())
-                websocket.send_json({
-                    "type": "message",
-                    "text": "What are the symptoms of diabetes?",
-                    "client_message_id": client_message_id
-                })
-                
-                # Receive streaming response
-                chunks_received = []
-                done_received = False
-                
-                # Collect messages until done
-                for _ in range(20):  # Limit iterations to avoid infinite loop
-                    try:
-                        response = websocket.receive_json(timeout=5)
-                        
-                        if response["type"] == "chunk":
-                            chunks_received.append(response)
-                            assert "messageId" in response or "message_id" in response
-                            assert "data" in response
-                        
-                        elif response["type"] == "done":
-                            done_received = True
-                            assert "message" in response
-                            # Message should have required fields
-                            message = response["message"]
-                            assert "id" in message
-                            assert "content" in message
-                            assert message["sender"] == "assistant"
-                            break
-                    
-                    except Exception as e:
-                        # Timeout or connection closed
-                        break
-                
-                # Verify we received streaming chunks and completion
-                assert len(chunks_received) > 0, "Should receive at least one chunk"
-                assert done_received, "Should receive done message"
-    
-    async def test_send_empty_message_returns_error(self, test_user, test_conversation):
-        """Test sending empty message returns error."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
-        
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send empty message
-                websocket.send_json({
-                    "type": "message",
-                    "text": "",
-                    "client_message_id": str(uuid4())
-                })
-                
-                # Should receive error
-                response = websocket.receive_json(timeout=5)
-                assert response["type"] == "error"
-                assert "text is required" in response.get("error", "").lower()
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Send user message
+            client_message_id = str(uuid4())
+            websocket.send_json({
+                "type": "message",
+                "text": "What are the symptoms of diabetes?",
+                "client_message_id": client_message_id
+            })
+            
+            chunks_received, final = _collect_stream(websocket)
+            
+            for chunk in chunks_received:
+                assert "messageId" in chunk or "message_id" in chunk
+                assert "data" in chunk
+            
+            done_received = final is not None and final["type"] == "done"
+            if done_received:
+                # Message should have required fields
+                message = final["message"]
+                assert "id" in message
+                assert "content" in message
+                assert message["sender"] == "assistant"
+            
+            # Verify we received streaming chunks and completion
+            assert len(chunks_received) > 0, "Should receive at least one chunk"
+            assert done_received, "Should receive done message"
     
     @pytest.mark.skip(reason="Duplicate detection requires persistent state across requests")
-    async def test_send_duplicate_message_ignored(self, test_user, test_conversation, mock_llm_provider):
+    async def test_send_duplicate_message_ignored(self, ws_client, user_token, test_conversation, mock_llm_provider):
         """Test duplicate messages (same client_message_id) are ignored."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
-        
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send message with specific client_message_id
-                client_message_id = str(uuid4())
-                message_data = {
-                    "type": "message",
-                    "text": "Test message",
-                    "client_message_id": client_message_id
-                }
-                
-                # Send first time
-                websocket.send_json(message_data)
-                
-                # Receive responses
-                first_responses = []
-                for _ in range(10):
-                    try:
-                        response = websocket.receive_json(timeout=2)
-                        first_responses.append(response)
-                        if response["type"] == "done":
-                            break
-                    except:
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Send message with specific client_message_id
+            client_message_id = str(uuid4())
+            message_data = {
+                "type": "message",
+                "text": "Test message",
+                "client_message_id": client_message_id
+            }
+            
+            # Send first time
+            websocket.send_json(message_data)
+            
+            # Receive responses
+            first_responses = []
+            for _ in range(10):
+                try:
+                    response = websocket.receive_json(timeout=2)
+                    first_responses.append(response)
+                    if response["type"] == "done":
                         break
-                
-                # Send same message again (duplicate)
-                websocket.send_json(message_data)
-                
-                # Should receive error about duplicate
-                response = websocket.receive_json(timeout=5)
-                assert response["type"] == "error"
-                assert "duplicate" in response.get("error", "").lower()
+                except:
+                    break
+            
+            # Send same message again (duplicate)
+            websocket.send_json(message_data)
+            
+            # Should receive error about duplicate
+            response = websocket.receive_json(timeout=5)
+            assert response["type"] == "error"
+            assert "duplicate" in response.get("error", "").lower()
 
 
 @pytest.mark.websocket
 @pytest.mark.integration
 @pytest.mark.skip(reason="WebSocket tests require special database setup - TestClient creates separate app instance")
+@pytest.mark.xdist_group(name="ws_protocol")
 @pytest.mark.asyncio
 class TestWebSocketProtocol:
     """Test WebSocket protocol compliance."""
     
-    async def test_invalid_json_returns_error(self, test_user, test_conversation):
-        """Test sending invalid JSON returns error."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
+    async def test_invalid_frames_return_errors(self, ws_client, user_token, test_conversation):
+        """Test empty messages, invalid JSON and unknown types each return an error."""
+        # (frame, expected error substring); str frames are sent as raw text
+        bad_frames = [
+            ({"type": "message", "text": "", "client_message_id": str(uuid4())}, "text is required"),
+            ("invalid json {", "json"),
+            ({"type": "unknown_type", "data": "test"}, "unknown"),
+        ]
         
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send invalid JSON
-                websocket.send_text("invalid json {")
-                
-                # Should receive error
-                response = websocket.receive_json(timeout=5)
-                assert response["type"] == "error"
-                assert "json" in response.get("error", "").lower()
-    
-    async def test_unknown_message_type_returns_error(self, test_user, test_conversation):
-        """Test unknown message type returns error."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
-        
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send unknown message type
-                websocket.send_json({
-                    "type": "unknown_type",
-                    "data": "test"
-                })
-                
-                # Should receive error
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Pipeline every bad frame, then drain one error per frame
+            for frame, _ in bad_frames:
+                if isinstance(frame, str):
+                    websocket.send_text(frame)
+                else:
+                    websocket.send_json(frame)
+            
+            for _, expected in bad_frames:
                 response = websocket.receive_json(timeout=5)
                 assert response["type"] == "error"
-                assert "unknown" in response.get("error", "").lower()
+                assert expected in response.get("error", "").lower()
     
-    async def test_ping_pong_keepalive(self, test_user, test_conversation):
+    async def test_ping_pong_keepalive(self, ws_client, user_token, test_conversation):
         """Test ping-pong keepalive mechanism."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
-        
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send multiple pings
-                for i in range(3):
-                    websocket.send_json({"type": "ping"})
-                    response = websocket.receive_json(timeout=5)
-                    assert response["type"] == "pong"
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Pipeline the pings, then drain one pong per ping
+            for _ in range(3):
+                websocket.send_json({"type": "ping"})
+            for _ in range(3):
+                response = websocket.receive_json(timeout=5)
+                assert response["type"] == "pong"
 
 
 @pytest.mark.websocket
 @pytest.mark.integration
 @pytest.mark.skip(reason="WebSocket tests require special database setup - TestClient creates separate app instance")
+@pytest.mark.xdist_group(name="ws_reconnection")
 @pytest.mark.asyncio
 class TestWebSocketReconnection:
     """Test WebSocket reconnection and resume functionality."""
     
-    async def test_resume_request(self, test_user, test_conversation):
+    async def test_resume_request(self, ws_client, user_token, test_conversation):
         """Test WebSocket resume functionality."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
-        
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send resume request
-                websocket.send_json({
-                    "type": "resume",
-                    "conversationId": str(test_conversation.id),
-                    "lastMessageId": str(uuid4())
-                })
-                
-                # Should receive resume acknowledgment
-                response = websocket.receive_json(timeout=5)
-                # Could be resume_ack or error (if no cached content)
-                assert response["type"] in ["resume_ack", "error"]
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Send resume request
+            websocket.send_json({
+                "type": "resume",
+                "conversationId": str(test_conversation.id),
+                "lastMessageId": str(uuid4())
+            })
+            
+            # Should receive resume acknowledgment
+            response = websocket.receive_json(timeout=5)
+            # Could be resume_ack or error (if no cached content)
+            assert response["type"] in ["resume_ack", "error"]
     
-    async def test_reconnect_after_disconnect(self, test_user, test_conversation):
+    async def test_reconnect_after_disconnect(self, ws_client, user_token, test_conversation):
         """Test reconnecting after disconnection."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
+        # First connection
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Send ping to confirm connection
+            websocket.send_json({"type": "ping"})
+            response = websocket.receive_json()
+            assert response["type"] == "pong"
         
-        with TestClient(app) as test_client:
-            # First connection
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send ping to confirm connection
-                websocket.send_json({"type": "ping"})
-                response = websocket.receive_json()
-                assert response["type"] == "pong"
-            
-            # Reconnect (new connection)
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Should be able to connect again
-                websocket.send_json({"type": "ping"})
-                response = websocket.receive_json()
-                assert response["type"] == "pong"
+        # Reconnect (new connection)
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Should be able to connect again
+            websocket.send_json({"type": "ping"})
+            response = websocket.receive_json()
+            assert response["type"] == "pong"
 
 
 @pytest.mark.websocket
 @pytest.mark.integration
 @pytest.mark.skip(reason="WebSocket tests require special database setup - TestClient creates separate app instance")
+@pytest.mark.xdist_group(name="ws_streaming")
 @pytest.mark.asyncio
 class TestWebSocketStreaming:
     """Test streaming behavior and chunk handling."""
     
-    async def test_stream_chunks_are_ordered(self, test_user, test_conversation, mock_llm_provider):
+    async def test_stream_chunks_are_ordered(self, ws_client, user_token, test_conversation, mock_llm_provider):
         """Test streaming chunks arrive in order."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
-        
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send message
-                websocket.send_json({
-                    "type": "message",
-                    "text": "Tell me about hypertension",
-                    "client_message_id": str(uuid4())
-                })
-                
-                # Collect chunks
-                chunks = []
-                for _ in range(20):
-                    try:
-                        response = websocket.receive_json(timeout=5)
-                        if response["type"] == "chunk":
-                            chunks.append(response["data"])
-                        elif response["type"] == "done":
-                            # Verify final message contains all chunks
-                            final_content = response["message"]["content"]
-                            # Chunks should be part of final content
-                            assert len(final_content) > 0
-                            break
-                    except:
-                        break
-                
-                # Should have received chunks
-                assert len(chunks) > 0
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Send message
+            websocket.send_json({
+                "type": "message",
+                "text": "Tell me about hypertension",
+                "client_message_id": str(uuid4())
+            })
+            
+            chunk_frames, final = _collect_stream(websocket)
+            chunks = [frame["data"] for frame in chunk_frames]
+            if final is not None and final["type"] == "done":
+                # Chunks should be part of final content
+                assert len(final["message"]["content"]) > 0
+            
+            # Should have received chunks
+            assert len(chunks) > 0
     
-    async def test_done_message_contains_complete_message(self, test_user, test_conversation, mock_llm_provider):
+    async def test_done_message_contains_complete_message(self, ws_client, user_token, test_conversation, mock_llm_provider):
         """Test done message contains complete message object."""
-        access_token = create_access_token(data={"sub": str(test_user.id)})
-        
-        with TestClient(app) as test_client:
-            with test_client.websocket_connect(
-                f"/ws/conversations/{test_conversation.id}?token={access_token}"
-            ) as websocket:
-                # Send message
-                websocket.send_json({
-                    "type": "message",
-                    "text": "What is asthma?",
-                    "client_message_id": str(uuid4())
-                })
-                
-                # Find done message
-                done_message = None
-                for _ in range(20):
-                    try:
-                        response = websocket.receive_json(timeout=5)
-                        if response["type"] == "done":
-                            done_message = response
-                            break
-                    except:
-                        break
-                
-                # Verify done message structure
-                assert done_message is not None
-                assert "message" in done_message
-                
-                message = done_message["message"]
-                assert "id" in message
-                assert "conversation_id" in message
-                assert "sender" in message
-                assert message["sender"] == "assistant"
-                assert "content" in message
-                assert len(message["content"]) > 0
-                assert "created_at" in message
+        with ws_client.websocket_connect(
+            f"/ws/conversations/{test_conversation.id}?token={user_token}"
+        ) as websocket:
+            # Send message
+            websocket.send_json({
+                "type": "message",
+                "text": "What is asthma?",
+                "client_message_id": str(uuid4())
+            })
+            
+            _, final = _collect_stream(websocket)
+            done_message = final if final is not None and final["type"] == "done" else None
+            
+            # Verify done message structure
+            assert done_message is not None
+            assert "message" in done_message
+            
+            message = done_message["message"]
+            assert "id" in message
+            assert "conversation_id" in message
+            assert "sender" in message
+            assert message["sender"] == "assistant"
+            assert "content" in message
+            assert len(message["content"]) > 0
+            assert "created_at" in message
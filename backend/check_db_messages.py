@@ -8,10 +8,11 @@ from sqlalchemy import text
 
 async def check_messages():
     async for db in get_db():
-        result = await db.execute(
+        # Stream rows instead of materializing them; yield_per fetches in batches
+        result = await db.stream(
             text("SELECT sender, content, status, message_metadata FROM messages ORDER BY created_at DESC LIMIT 10")
+            .execution_options(yield_per=100)
         )
-        rows = result.fetchall()
         
         print("\n" + "="*120)
         print("RECENT MESSAGES IN DATABASE")
@@ -19,9 +20,14 @@ async def check_messages():
         print(f"{'Sender':<12} | {'Status':<10} | {'Content':<45} | Metadata")
         print("-"*120)
         
-        for row in rows:
-            metadata = str(row[3])[:50] if row[3] else "None"
-            print(f"{row[0]:<12} | {row[2]:<10} | {row[1][:45]:<45} | {metadata}")
+        # Format every row, then emit them with a single write
+        row_format = "{:<12} | {:<10} | {:<45} | {}".format
+        lines = [
+            row_format(row[0], row[2], (row[1] or "")[:45], str(row[3])[:50] if row[3] else "None")
+            async for row in result
+        ]
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
         
         await db.close()
         break
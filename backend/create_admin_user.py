@@ -4,44 +4,50 @@ Run: python create_admin_user.py
 """
 
 import asyncio
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.db.session import AsyncSessionLocal
 from app.models.user import User
 from app.core.security import hash_password
 
 async def create_admin():
+    # bcrypt is CPU-bound; hash on a worker thread so the event loop stays free
+    hashed_password = await asyncio.to_thread(hash_password, "admin123")
+    
     async with AsyncSessionLocal() as session:
-        # Check if admin already exists
-        from sqlalchemy import select
-        result = await session.execute(
-            select(User).where(User.email == "admin@veda.com")
+        # Create the admin, or promote an existing non-admin account, in one atomic
+        # statement. An account that is already admin is left untouched and no row
+        # comes back; otherwise xmax = 0 only for a freshly inserted row.
+        stmt = (
+            pg_insert(User)
+            .values(
+                email="admin@veda.com",
+                name="Admin User",
+                hashed_password=hashed_password,
+                role="admin"
+            )
+            .on_conflict_do_update(
+                index_elements=[User.email],
+                set_={"role": "admin"},
+                where=User.role.is_distinct_from("admin")
+            )
+            .returning(User.id, User.role, literal_column("xmax = 0").label("inserted"))
         )
-        existing_admin = result.scalar_one_or_none()
+        admin = (await session.execute(stmt)).first()
+        await session.commit()
         
-        if existing_admin:
+        if admin is None:
             print("✅ Admin user already exists!")
-            print(f"   Email: {existing_admin.email}")
-            print(f"   Role: {existing_admin.role}")
-            print(f"   ID: {existing_admin.id}")
-            
-            # Update to admin if not already
-            if existing_admin.role != "admin":
-                existing_admin.role = "admin"
-                await session.commit()
-                print("   ✅ Updated role to admin!")
+            print(f"   Email: admin@veda.com")
+            print(f"   Role: admin")
             return
         
-        # Create new admin user
-        admin = User(
-            email="admin@veda.com",
-            name="Admin User",
-            hashed_password=hash_password("admin123"),
-            role="admin"
-        )
-        
-        session.add(admin)
-        await session.commit()
-        await session.refresh(admin)
+        if not admin.inserted:
+            print("✅ Admin user already exists!")
+            print(f"   Email: admin@veda.com")
+            print(f"   ID: {admin.id}")
+            print("   ✅ Updated role to admin!")
+            return
         
         print("✅ Admin user created successfully!")
         print(f"   Email: admin@veda.com")
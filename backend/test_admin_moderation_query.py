@@ -1,17 +1,24 @@
 """
 Test admin moderation endpoint to verify it can query flagged/blocked messages.
+
+Run: python test_admin_moderation_query.py
+Or with the other live checks, one per worker:
+    pytest -n auto test_admin_moderation_query.py test_all_password_reset.py \
+        test_auth_provider.py test_auth_upgrade.py
+Set KEEP_TEST_MESSAGES=1 to keep the seeded messages for frontend testing.
 """
 
 import asyncio
-from sqlalchemy import select, func
+import os
+import sys
+from uuid import UUID
+from sqlalchemy import delete, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal, engine
 from app.models.message import Message
 from app.models.conversation import Conversation
 from app.models.user import User
-from app.schemas.chat import MessageCreate
-from app.crud.message import MessageCRUD
 
 
 async def create_test_moderation_messages():
@@ -20,104 +27,76 @@ async def create_test_moderation_messages():
     print("Creating test moderation messages...")
     print("="*60)
     
-    async for db in get_db():
-        try:
-            # Get test user and conversation
-            result = await db.execute(select(Conversation).limit(1))
-            conversation = result.scalars().first()
-            
-            if not conversation:
-                print("❌ No conversation found")
-                return []
-            
-            test_messages = []
-            
-            # Create HIGH severity - blocked
-            msg1 = MessageCreate(
-                content="I want to commit suicide",
-                message_metadata={
-                    "moderation": {
-                        "action": "block",
-                        "severity": "HIGH",
-                        "matched_keywords": ["suicide"],
-                        "is_safe": False
-                    }
+    async with AsyncSessionLocal() as db, db.begin():
+        # Get test user and conversation
+        result = await db.execute(select(Conversation).limit(1))
+        conversation = result.scalars().first()
+        
+        if not conversation:
+            print("❌ No conversation found")
+            return []
+        
+        # Build every message up front and insert them in one transaction
+        blocked = Message(
+            conversation_id=conversation.id,
+            sender="user",
+            content="I want to commit suicide",
+            status="blocked",
+            message_metadata={
+                "moderation": {
+                    "action": "block",
+                    "severity": "HIGH",
+                    "matched_keywords": ["suicide"],
+                    "is_safe": False
                 }
-            )
-            blocked = await MessageCRUD.create(
-                db=db,
-                message_create=msg1,
-                conversation_id=conversation.id,
-                sender="user",
-                status="blocked"
-            )
-            test_messages.append(blocked)
-            print(f"✓ Created BLOCKED message: {blocked.id}")
-            
-            # Create MEDIUM severity - flagged
-            msg2 = MessageCreate(
-                content="Where can I buy cocaine?",
-                message_metadata={
-                    "moderation": {
-                        "action": "flag",
-                        "severity": "MEDIUM",
-                        "matched_keywords": ["cocaine"],
-                        "is_safe": True
-                    }
+            }
+        )
+        flagged1 = Message(
+            conversation_id=conversation.id,
+            sender="user",
+            content="Where can I buy cocaine?",
+            status="flagged",
+            message_metadata={
+                "moderation": {
+                    "action": "flag",
+                    "severity": "MEDIUM",
+                    "matched_keywords": ["cocaine"],
+                    "is_safe": True
                 }
-            )
-            flagged1 = await MessageCRUD.create(
-                db=db,
-                message_create=msg2,
-                conversation_id=conversation.id,
-                sender="user",
-                status="flagged"
-            )
-            test_messages.append(flagged1)
-            print(f"✓ Created FLAGGED message (MEDIUM): {flagged1.id}")
-            
-            # Create MEDICAL_EMERGENCY severity - flagged
-            msg3 = MessageCreate(
-                content="I'm having severe chest pain",
-                message_metadata={
-                    "moderation": {
-                        "action": "flag",
-                        "severity": "MEDICAL_EMERGENCY",
-                        "matched_keywords": ["chest pain"],
-                        "is_safe": True
-                    }
+            }
+        )
+        flagged2 = Message(
+            conversation_id=conversation.id,
+            sender="user",
+            content="I'm having severe chest pain",
+            status="flagged",
+            message_metadata={
+                "moderation": {
+                    "action": "flag",
+                    "severity": "MEDICAL_EMERGENCY",
+                    "matched_keywords": ["chest pain"],
+                    "is_safe": True
                 }
-            )
-            flagged2 = await MessageCRUD.create(
-                db=db,
-                message_create=msg3,
-                conversation_id=conversation.id,
-                sender="user",
-                status="flagged"
-            )
-            test_messages.append(flagged2)
-            print(f"✓ Created FLAGGED message (EMERGENCY): {flagged2.id}")
-            
-            # Create normal message
-            msg4 = MessageCreate(
-                content="What are the symptoms of diabetes?",
-                message_metadata={}
-            )
-            normal = await MessageCRUD.create(
-                db=db,
-                message_create=msg4,
-                conversation_id=conversation.id,
-                sender="user",
-                status="sent"
-            )
-            test_messages.append(normal)
-            print(f"✓ Created SENT message: {normal.id}")
-            
-            return [str(msg.id) for msg in test_messages]
-            
-        finally:
-            await db.close()
-            break
+            }
+        )
+        normal = Message(
+            conversation_id=conversation.id,
+            sender="user",
+            content="What are the symptoms of diabetes?",
+            status="sent",
+            message_metadata={}
+        )
+        test_messages = [blocked, flagged1, flagged2, normal]
+        
+        db.add_all(test_messages)
+        await db.flush()
+        
+        print(f"✓ Created BLOCKED message: {blocked.id}")
+        print(f"✓ Created FLAGGED message (MEDIUM): {flagged1.id}")
+        print(f"✓ Created FLAGGED message (EMERGENCY): {flagged2.id}")
+        print(f"✓ Created SENT message: {normal.id}")
+        
+        return [str(msg.id) for msg in test_messages]
 
 
 async def query_moderation_messages():
@@ -126,71 +105,73 @@ async def query_moderation_messages():
     print("Querying messages by moderation status...")
     print("="*60)
     
-    async for db in get_db():
-        try:
-            # Query BLOCKED messages
-            print("\n--- BLOCKED Messages ---")
-            result = await db.execute(
-                select(Message)
-                .where(Message.status == "blocked")
-                .order_by(Message.created_at.desc())
-                .limit(10)
+    async with AsyncSessionLocal() as db:
+        # Latest 10 blocked and 10 flagged messages in one query, selecting
+        # only the printed columns so no ORM objects are built
+        ranked = (
+            select(
+                Message.id,
+                Message.content,
+                Message.status,
+                Message.message_metadata,
+                Message.created_at,
+                func.row_number().over(
+                    partition_by=Message.status,
+                    order_by=Message.created_at.desc()
+                ).label("rank")
             )
-            blocked_msgs = result.scalars().all()
-            
-            print(f"Found {len(blocked_msgs)} blocked messages:")
-            for msg in blocked_msgs:
-                moderation = msg.message_metadata.get("moderation", {})
-                print(f"  • ID: {msg.id}")
-                print(f"    Content: {msg.content[:50]}...")
-                print(f"    Status: {msg.status}")
-                print(f"    Severity: {moderation.get('severity', 'N/A')}")
-                print(f"    Keywords: {moderation.get('matched_keywords', [])}")
-                print()
-            
-            # Query FLAGGED messages
-            print("\n--- FLAGGED Messages ---")
-            result = await db.execute(
-                select(Message)
-                .where(Message.status == "flagged")
-                .order_by(Message.created_at.desc())
-                .limit(10)
+            .where(Message.status.in_(["blocked", "flagged"]))
+            .subquery()
+        )
+        
+        # Stream the rows in batches; each one is formatted and dropped, so only
+        # the output lines are kept
+        result = await db.stream(
+            select(ranked)
+            .where(ranked.c.rank <= 10)
+            .order_by(ranked.c.created_at.desc())
+            .execution_options(yield_per=100)
+        )
+        entries = {"blocked": [], "flagged": []}
+        async for msg in result:
+            moderation = msg.message_metadata.get("moderation", {})
+            entries[msg.status].append(
+                f"  • ID: {msg.id}\n"
+                f"    Content: {msg.content[:50]}...\n"
+                f"    Status: {msg.status}\n"
+                f"    Severity: {moderation.get('severity', 'N/A')}\n"
+                f"    Keywords: {moderation.get('matched_keywords', [])}\n"
+                "\n"
             )
-            flagged_msgs = result.scalars().all()
-            
-            print(f"Found {len(flagged_msgs)} flagged messages:")
-            for msg in flagged_msgs:
-                moderation = msg.message_metadata.get("moderation", {})
-                print(f"  • ID: {msg.id}")
-                print(f"    Content: {msg.content[:50]}...")
-                print(f"    Status: {msg.status}")
-                print(f"    Severity: {moderation.get('severity', 'N/A')}")
-                print(f"    Keywords: {moderation.get('matched_keywords', [])}")
-                print()
-            
-            # Query all moderation stats
-            print("\n--- Moderation Statistics ---")
-            result = await db.execute(
-                select(
-                    Message.status,
-                    func.count(Message.id).label('count')
-                )
-                .group_by(Message.status)
+        
+        # Build both listings, then emit them with a single write
+        lines = []
+        for status, status_entries in entries.items():
+            lines.append(f"\n--- {status.upper()} Messages ---\n")
+            lines.append(f"Found {len(status_entries)} {status} messages:\n")
+            lines.extend(status_entries)
+        sys.stdout.write("".join(lines))
+        
+        # Query all moderation stats as filtered counts in one aggregate row
+        print("\n--- Moderation Statistics ---")
+        result = await db.execute(
+            select(
+                func.count().filter(Message.status == "blocked").label("blocked"),
+                func.count().filter(Message.status == "flagged").label("flagged"),
+                func.count().label("total")
             )
-            stats = result.all()
-            
-            for status, count in stats:
-                print(f"  • {status}: {count} messages")
-            
-            # Verify test messages exist
-            if len(blocked_msgs) > 0 and len(flagged_msgs) > 0:
-                print("\n✅ SUCCESS: Admin can query messages by moderation status")
-            else:
-                print("\n⚠️  WARNING: No moderation messages found")
-            
-        finally:
-            await db.close()
-            break
+        )
+        stats = result.one()
+        
+        print(f"  • blocked: {stats.blocked} messages")
+        print(f"  • flagged: {stats.flagged} messages")
+        print(f"  • total: {stats.total} messages")
+        
+        # Verify test messages exist
+        if entries["blocked"] and entries["flagged"]:
+            print("\n✅ SUCCESS: Admin can query messages by moderation status")
+        else:
+            print("\n⚠️  WARNING: No moderation messages found")
 
 
 async def cleanup_test_messages(message_ids):
@@ -202,27 +183,22 @@ async def cleanup_test_messages(message_ids):
     print("Cleaning up test messages...")
     print("="*60)
     
-    async for db in get_db():
-        try:
-            from uuid import UUID
-            for msg_id in message_ids:
-                result = await db.execute(
-                    select(Message).where(Message.id == UUID(msg_id))
-                )
-                msg = result.scalars().first()
-                if msg:
-                    await db.delete(msg)
-            
-            await db.commit()
-            print(f"✓ Deleted {len(message_ids)} test messages")
-            
-        finally:
-            await db.close()
-            break
+    # Parse the ids before taking a connection, so a bad id fails fast
+    uuids = [UUID(msg_id) for msg_id in message_ids]
+    
+    async with AsyncSessionLocal() as db, db.begin():
+        # One bulk DELETE instead of a SELECT and DELETE per message
+        result = await db.execute(
+            delete(Message)
+            .where(Message.id.in_(uuids))
+            .execution_options(synchronize_session=False)
+        )
+        
+        print(f"✓ Deleted {result.rowcount} test messages")
 
 
-async def main():
-    """Run moderation query tests."""
+async def test_moderation_admin_query():
+    """Seed, query and clean up moderation messages."""
     print("\n" + "="*60)
     print("ADMIN MODERATION QUERY TEST")
     print("="*60)
@@ -234,11 +210,9 @@ async def main():
         # Query messages (simulate admin endpoint)
         await query_moderation_messages()
         
-        # Ask user if they want to keep the test messages
+        # Keep the test messages only when asked to; no prompt, so pytest can run this
         print("\n" + "="*60)
-        response = input("Keep test messages for frontend testing? (y/N): ")
-        
-        if response.lower() != 'y':
+        if os.getenv("KEEP_TEST_MESSAGES") != "1":
             await cleanup_test_messages(message_ids)
         else:
             print("✓ Test messages kept. You can view them in the admin moderation page.")
@@ -247,7 +221,15 @@ async def main():
         print("\n" + "="*60)
         print("TEST COMPLETED")
         print("="*60)
-        
+    finally:
+        # Pooled connections belong to this event loop; don't leak them into the next
+        await engine.dispose()
+
+
+async def main():
+    """Run moderation query tests."""
+    try:
+        await test_moderation_admin_query()
     except Exception as e:
         print(f"\n❌ Test failed: {e}")
         import traceback
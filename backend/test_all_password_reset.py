@@ -5,20 +5,29 @@ Tests:
 1. /api/auth/forgot-password - Initial password reset request
 2. /api/auth/resend-password-reset - Resend reset link
 3. /api/auth/sync-password - Sync password after reset (validation only)
+
+Run: python test_all_password_reset.py (or under pytest, see test_admin_moderation_query.py)
 """
-import requests
-import time
+import asyncio
+import httpx
+import pytest_asyncio
 
 BASE_URL = "http://localhost:8000"
+BORDER = "=" * 70
 
 def print_header(title):
     """Print a formatted header"""
-    print("\n" + "=" * 70)
-    print(f"  {title}")
-    print("=" * 70)
+    print(f"\n{BORDER}\n  {title}\n{BORDER}")
+
+
+@pytest_asyncio.fixture
+async def client():
+    """Shared client for the checks when run under pytest."""
+    async with httpx.AsyncClient(base_url=BASE_URL, http2=True) as client:
+        yield client
 
 
-def test_all_password_reset_endpoints():
+async def test_all_password_reset_endpoints(client: httpx.AsyncClient):
     """Test all password reset endpoints"""
     
     print_header("COMPREHENSIVE PASSWORD RESET ENDPOINTS TEST")
@@ -29,8 +38,8 @@ def test_all_password_reset_endpoints():
     print_header("TEST 1: /forgot-password endpoint")
     print(f"Testing with email: {test_email}")
     
-    response = requests.post(
-        f"{BASE_URL}/api/auth/forgot-password",
+    response = await client.post(
+        "/api/auth/forgot-password",
         json={"email": test_email}
     )
     
@@ -42,15 +51,12 @@ def test_all_password_reset_endpoints():
     else:
         print("❌ Forgot password endpoint failed")
     
-    # Wait before resending
-    time.sleep(2)
-    
     # Test 2: Resend Password Reset
     print_header("TEST 2: /resend-password-reset endpoint")
     print(f"Resending to email: {test_email}")
     
-    response = requests.post(
-        f"{BASE_URL}/api/auth/resend-password-reset",
+    response = await client.post(
+        "/api/auth/resend-password-reset",
         json={"email": test_email}
     )
     
@@ -67,8 +73,8 @@ def test_all_password_reset_endpoints():
     print("Note: Full test requires real Firebase ID token")
     
     # Test missing token
-    response = requests.post(
-        f"{BASE_URL}/api/auth/sync-password",
+    response = await client.post(
+        "/api/auth/sync-password",
         json={"new_password": "NewPassword123!"}
     )
     
@@ -81,8 +87,8 @@ def test_all_password_reset_endpoints():
         print("❌ Validation not working as expected")
     
     # Test invalid token
-    response = requests.post(
-        f"{BASE_URL}/api/auth/sync-password",
+    response = await client.post(
+        "/api/auth/sync-password",
         json={
             "firebase_id_token": "invalid_token_123",
             "new_password": "NewPassword123!"
@@ -104,16 +110,10 @@ def test_all_password_reset_endpoints():
     # Test email enumeration protection
     print("Testing email enumeration protection...")
     
-    existing_response = requests.post(
-        f"{BASE_URL}/api/auth/forgot-password",
-        json={"email": test_email}
-    )
-    
-    time.sleep(1)
-    
-    nonexistent_response = requests.post(
-        f"{BASE_URL}/api/auth/forgot-password",
-        json={"email": "nonexistent999@example.com"}
+    # The two lookups are independent, so send them concurrently
+    existing_response, nonexistent_response = await asyncio.gather(
+        client.post("/api/auth/forgot-password", json={"email": test_email}),
+        client.post("/api/auth/forgot-password", json={"email": "nonexistent999@example.com"})
     )
     
     if (existing_response.json().get("message") == 
@@ -133,14 +133,17 @@ def test_all_password_reset_endpoints():
         "spaces in@email.com"
     ]
     
-    validation_passed = 0
-    for invalid_email in invalid_emails:
-        response = requests.post(
-            f"{BASE_URL}/api/auth/forgot-password",
-            json={"email": invalid_email}
-        )
-        if response.status_code == 422:
-            validation_passed += 1
+    # Concurrent, but capped so a longer list doesn't flood the server
+    semaphore = asyncio.Semaphore(4)
+    
+    async def post_invalid_email(invalid_email):
+        async with semaphore:
+            return await client.post("/api/auth/forgot-password", json={"email": invalid_email})
+    
+    responses = await asyncio.gather(*(
+        post_invalid_email(invalid_email) for invalid_email in invalid_emails
+    ))
+    validation_passed = sum(response.status_code == 422 for response in responses)
     
     print(f"Validation tests passed: {validation_passed}/{len(invalid_emails)}")
     if validation_passed == len(invalid_emails):
@@ -159,15 +162,19 @@ def test_all_password_reset_endpoints():
     print("  ✓ Email validation")
     print("  ✓ Firebase token verification")
     print("  ✓ Password length validation")
-    print("\n" + "=" * 70)
-    print("All password reset endpoints are ready for frontend integration!")
-    print("=" * 70)
+    print(f"\n{BORDER}\nAll password reset endpoints are ready for frontend integration!\n{BORDER}")
+
+
+async def main():
+    """Run the checks over one shared client."""
+    async with httpx.AsyncClient(base_url=BASE_URL, http2=True) as client:
+        await test_all_password_reset_endpoints(client)
 
 
 if __name__ == "__main__":
     try:
-        test_all_password_reset_endpoints()
-    except requests.exceptions.ConnectionError:
+        asyncio.run(main())
+    except httpx.ConnectError:
         print("\n❌ Error: Could not connect to server.")
         print("   Make sure the FastAPI server is running on http://localhost:8000")
         print("\nTo start the server:")
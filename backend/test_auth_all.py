@@ -0,0 +1,24 @@
+"""
+Run the auth provider checks back to back in one process.
+
+Both scripts share the module-level engine from app.db.session, so running
+them together reuses one event loop and one pooled connection instead of
+paying two interpreter startups and two database handshakes.
+
+Run: python test_auth_all.py
+"""
+import asyncio
+from app.db.session import engine
+from test_auth_provider import check_auth_providers
+from test_auth_upgrade import auth_upgrade_scenario
+
+async def main():
+    """Run both auth checks, then close the pool once."""
+    try:
+        await check_auth_providers()
+        await auth_upgrade_scenario()
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,32 +1,47 @@
 """
 Quick test script to verify auth_provider is set correctly
+
+Run: python test_auth_provider.py (or under pytest, see test_admin_moderation_query.py)
 """
 import asyncio
+import sys
 from sqlalchemy import text
-from app.db.session import AsyncSessionLocal
+from app.db.session import AsyncSessionLocal, engine
+
+# Marker shown next to each user's auth_provider
+PROVIDER_EMOJI = {"email": "📧", "google": "🔵"}
 
 async def check_auth_providers():
     """Check auth_provider values in database"""
     async with AsyncSessionLocal() as session:
-        # Get all users with their auth_provider
-        result = await session.execute(
+        # Stream all users with their auth_provider instead of buffering the table
+        result = await session.stream(
             text("SELECT email, auth_provider FROM users ORDER BY created_at DESC")
         )
-        users = result.fetchall()
         
         print("\n" + "="*60)
         print("Current Users in Database:")
         print("="*60)
         
-        if not users:
+        # Format every row, then emit them with a single write
+        lines = [
+            f"{PROVIDER_EMOJI.get(auth_provider, '❓')} {email:<40} → {auth_provider}\n"
+            async for email, auth_provider in result
+        ]
+        
+        if not lines:
             print("No users found in database")
         else:
-            for user in users:
-                email, auth_provider = user
-                emoji = "📧" if auth_provider == "email" else "🔵" if auth_provider == "google" else "❓"
-                print(f"{emoji} {email:<40} → {auth_provider}")
+            sys.stdout.write("".join(lines))
         
         print("="*60 + "\n")
 
+async def test_auth_providers():
+    """Pytest entry point; closes the pool so it doesn't outlive the test's event loop."""
+    try:
+        await check_auth_providers()
+    finally:
+        await engine.dispose()
+
 if __name__ == "__main__":
     asyncio.run(check_auth_providers())
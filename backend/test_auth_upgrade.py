@@ -5,23 +5,30 @@ Scenario:
 1. User registers with email/password → auth_provider = 'email'
 2. User later signs in with Google OAuth (same email) → auth_provider upgrades to 'google'
 3. User can now login with either method, but is treated as Google user (no email verification required)
+
+Run: python test_auth_upgrade.py (or under pytest, see test_admin_moderation_query.py)
 """
 import asyncio
 from sqlalchemy import text
-from app.db.session import AsyncSessionLocal
+from app.db.session import AsyncSessionLocal, engine
 
-async def test_auth_upgrade_scenario():
+BORDER = "=" * 70
+DASH = "-" * 70
+
+async def auth_upgrade_scenario():
     """
     Simulate the auth provider upgrade scenario
     """
-    print("\n" + "="*70)
-    print("AUTH PROVIDER UPGRADE SCENARIO TEST")
-    print("="*70)
+    print(f"\n{BORDER}\nAUTH PROVIDER UPGRADE SCENARIO TEST\n{BORDER}")
     
     async with AsyncSessionLocal() as session:
-        # Pick a test email that exists
+        # Pick the most recently registered user; only whether a password is
+        # set matters, so the hash itself never leaves the database
         result = await session.execute(
-            text("SELECT email, auth_provider, hashed_password FROM users LIMIT 1")
+            text(
+                "SELECT email, auth_provider, hashed_password IS NOT NULL AS has_password "
+                "FROM users ORDER BY created_at DESC LIMIT 1"
+            )
         )
         user = result.fetchone()
         
@@ -34,9 +41,7 @@ async def test_auth_upgrade_scenario():
         print(f"Current auth_provider: {auth_provider}")
         print(f"Has password: {'Yes' if has_password else 'No'}")
         
-        print("\n" + "-"*70)
-        print("SCENARIO WALKTHROUGH:")
-        print("-"*70)
+        print(f"\n{DASH}\nSCENARIO WALKTHROUGH:\n{DASH}")
         
         print("\n1️⃣ User registers with email/password")
         print(f"   ➜ auth_provider = 'email' ✅")
@@ -53,17 +58,13 @@ async def test_auth_upgrade_scenario():
         print(f"   ➜ No email verification required (Google verified)")
         print(f"   ➜ Password reset still available (if needed)")
         
-        print("\n" + "-"*70)
-        print("BENEFITS:")
-        print("-"*70)
+        print(f"\n{DASH}\nBENEFITS:\n{DASH}")
         print("✅ Flexible login options (password OR Google)")
         print("✅ Skip email verification (Google already verified)")
         print("✅ Improved user experience")
         print("✅ Security: Google's verification trusted")
         
-        print("\n" + "-"*70)
-        print("CODE FLOW:")
-        print("-"*70)
+        print(f"\n{DASH}\nCODE FLOW:\n{DASH}")
         print("""
         @router.post("/auth/google/callback")
         async def google_callback(...):
@@ -75,14 +76,19 @@ async def test_auth_upgrade_scenario():
                 logger.info("✅ User upgraded to Google OAuth")
         """)
         
-        print("\n" + "="*70)
-        print("To test this feature:")
-        print("="*70)
+        print(f"\n{BORDER}\nTo test this feature:\n{BORDER}")
         print("1. Register a new user with email/password")
         print("2. Check database: auth_provider = 'email'")
         print("3. Sign in with Google OAuth (same email)")
         print("4. Check database: auth_provider = 'google' ✅")
-        print("="*70 + "\n")
+        print(BORDER + "\n")
+
+async def test_auth_upgrade_scenario():
+    """Pytest entry point; closes the pool so it doesn't outlive the test's event loop."""
+    try:
+        await auth_upgrade_scenario()
+    finally:
+        await engine.dispose()
 
 if __name__ == "__main__":
     asyncio.run(test_auth_upgrade_scenario())